@@ -29,7 +29,7 @@ class HomePricePredictor:
         X_train_scaled = self.scaler.fit_transform(X_train)
         
         # Train model
-        self.model = RandomForestRegressor(n_estimators=100, random_state=42)
+        self.model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1)
         self.model.fit(X_train_scaled, y_train)
         
         # Save model and scaler
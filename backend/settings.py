@@ -62,6 +62,9 @@ CORS_ALLOW_HEADERS = [
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Unreferenced media modified this recently (seconds) is kept: an identical
+# upload may be about to reference it again
+MEDIA_GC_GRACE = 3600
 # Application definition
 
 INSTALLED_APPS = [
@@ -117,9 +120,38 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Take the write lock when a transaction starts so concurrent
+            # read-then-write paths (bid placement) are serialized
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+        # A file-backed test database so concurrency tests exercise real
+        # SQLite locking rather than the shared-cache in-memory database
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
+# Shared cache for cross-process state such as the login rate limits
+# (users.throttling); the table is created by `manage.py createcachetable`
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+    },
+}
+
+# Render and Vercel each put one proxy in front of the app; the client
+# address is the last X-Forwarded-For entry it appends
+TRUSTED_PROXY_COUNT = 1
+
+# Listing locations are free text; map substrings onto the price model's
+# urban/suburban/rural categories, e.g. {'lahore': 'urban'}
+# (users.prediction.location_category)
+PRICE_LOCATION_ALIASES = {}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -139,6 +171,17 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# The first hasher encodes new passwords; its PBKDF2 work factor is set by
+# PASSWORD_PBKDF2_ITERATIONS (Django's default when unset). Measure the cost
+# on the deployment hardware with `manage.py benchmark_login`.
+PASSWORD_HASHERS = [
+    'users.hashers.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
@@ -158,8 +201,9 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STORAGES = {
 
+    # Uploads are stored once per distinct content, named by their SHA-256
     "default": {
-        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "BACKEND": "users.storage.ContentAddressedStorage",
     },
 
     "staticfiles": {
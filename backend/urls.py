@@ -15,11 +15,13 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+import re
+
 from django.contrib import admin
-from django.urls import path, include
-from users.views import hello_world, PropertyCreateView , PropertyDeleteView,PropertyDetailView,PropertyUpdateView,get_properties, PricePredictionView
-from django.conf.urls.static import static
+from django.urls import path, include, re_path
+from users.views import hello_world, PropertyCreateView , PropertyDeleteView,PropertyDetailView,PropertyUpdateView,get_properties, search_properties, PricePredictionView, BatchPricePredictionView, PredictionStatsView
 from django.conf import settings
+from users.media import serve_media
 
 
 urlpatterns = [
@@ -28,12 +30,17 @@ urlpatterns = [
     path('api/auth/', include('users.urls')),
     path('api/auth/properties-create/', PropertyCreateView.as_view(), name='property-create'),
     path('properties/', get_properties, name='get_properties'),
+    path('properties/search/', search_properties, name='search-properties'),
     path('property/delete/<int:id>/', PropertyDeleteView.as_view(), name='delete-property'),
     path('property/edit/<int:id>/', PropertyDetailView.as_view(), name='edit-property'),
     path('property/update/<int:id>/', PropertyUpdateView.as_view(), name='update-property'),
     path('api/predict-price/', PricePredictionView.as_view(), name='predict-price'),
+    path('api/predict-price/batch/', BatchPricePredictionView.as_view(), name='predict-price-batch'),
+    path('api/predict-price/stats/', PredictionStatsView.as_view(), name='predict-price-stats'),
 
 
 ]
 
-urlpatterns +=static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+urlpatterns += [
+    re_path(r'^%s(?P<path>.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media, name='media'),
+]
@@ -1,9 +1,12 @@
-from django.urls import path, include
+import re
+
+from django.urls import path, include, re_path
 from .api.views import PricePredictionView
 from django.conf import settings
-from django.conf.urls.static import static
+from users.media import serve_media
 
 urlpatterns = [
     path('api/', include('users.urls')),  # This will prefix all URLs with /api/
     path('api/predict-price/', PricePredictionView.as_view(), name='predict-price'),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT) 
\ No newline at end of file
+    re_path(r'^%s(?P<path>.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media, name='media'),
+] 
\ No newline at end of file
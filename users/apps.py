@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        from django.conf import settings
+        if getattr(settings, 'PRICE_MODEL_PRELOAD', False):
+            from .prediction import ModelNotAvailable, price_model_registry
+            try:
+                price_model_registry.get()
+            except ModelNotAvailable:
+                # Prediction views report this per request; don't block startup
+                pass
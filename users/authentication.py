@@ -0,0 +1,76 @@
+import asyncio
+import copy
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, make_password
+from rest_framework.authentication import TokenAuthentication
+
+from .cache import LRUCache
+
+
+# Token key -> (user, token). Entries are dropped on logout, user deletion
+# and user changes in this process (see users.signals); the TTL bounds how
+# long other worker processes can keep serving a stale entry.
+token_cache = LRUCache(
+    max_size=getattr(settings, 'AUTH_TOKEN_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'AUTH_TOKEN_CACHE_TTL', 300),
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication that skips the token/user query on cache hits."""
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            # Raises AuthenticationFailed for unknown keys and inactive users
+            cached = super().authenticate_credentials(key)
+            token_cache.set(key, cached)
+        user, token = cached
+        # Hand each request its own instance so per-request mutation of the
+        # user can't leak into the shared cache entry
+        return copy.copy(user), token
+
+
+def invalidate_token(key):
+    token_cache.delete(key)
+
+
+def invalidate_user_tokens(user_id):
+    token_cache.delete_where(lambda entry: entry[0].pk == user_id)
+
+
+# Password hashing is deliberately slow. Running it on its own pool keeps an
+# ASGI event loop free to serve other requests while a login is verified, and
+# since hashlib's PBKDF2 releases the GIL the pool hashes in parallel.
+_password_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'LOGIN_HASH_WORKERS', os.cpu_count() or 2),
+    thread_name_prefix='login-hash',
+)
+
+
+async def acheck_credentials(email, password):
+    """Return the user matching ``email`` and ``password``, or None."""
+    loop = asyncio.get_running_loop()
+    User = get_user_model()
+    try:
+        user = await User.objects.aget(email=email)
+    except User.DoesNotExist:
+        # Hash anyway so unknown emails take as long as wrong passwords
+        await loop.run_in_executor(_password_executor, make_password, password)
+        return None
+
+    outdated = []
+    valid = await loop.run_in_executor(
+        _password_executor, check_password, password, user.password, outdated.append,
+    )
+    if not valid:
+        return None
+    if outdated:
+        # Stored with an older hasher or iteration count; re-encode it now
+        user.password = await loop.run_in_executor(_password_executor, make_password, password)
+        await user.asave(update_fields=['password'])
+    return user
@@ -0,0 +1,311 @@
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .events import bid_payload, publish_property_event, publish_user_event
+from .models import Bid, Property
+
+
+# Opening bids may start slightly under the asking price
+MIN_BID_RATIO = Decimal('0.97')
+
+
+class BidError(Exception):
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def parse_amount(amount):
+    try:
+        if isinstance(amount, str):
+            amount = Decimal(amount.replace(',', ''))
+        else:
+            amount = Decimal(str(amount))
+    except (InvalidOperation, ValueError):
+        raise BidError('Invalid bid amount')
+    if not amount.is_finite() or amount <= 0:
+        raise BidError('Invalid bid amount')
+    return amount
+
+
+def place_bid(property_id, bidder, amount):
+    """Validate and record a bid as one atomic step.
+
+    The property row is locked for the duration of the transaction
+    (``select_for_update`` on backends that support it; on SQLite the
+    database is opened with ``BEGIN IMMEDIATE`` so writers are serialized),
+    which makes the highest-bid check and the insert indivisible.
+    """
+    amount = parse_amount(amount)
+    increment = Decimal(str(getattr(settings, 'BID_MIN_INCREMENT', 0)))
+
+    with transaction.atomic():
+        try:
+            property_obj = Property.objects.select_for_update().get(id=property_id)
+        except (Property.DoesNotExist, ValueError, TypeError):
+            raise BidError('Property not found', status_code=404)
+
+        if property_obj.is_bidding_closed:
+            raise BidError('Bidding time has expired for this property')
+
+        if property_obj.accepted_bid_id is not None:
+            raise BidError('Bidding is closed because a bid has been accepted')
+
+        min_bid = Decimal(property_obj.actual_price) * MIN_BID_RATIO
+        if amount < min_bid:
+            raise BidError(f'Bid must be at least {min_bid:.2f}')
+
+        highest = property_obj.highest_bid_amount
+        if highest is not None:
+            if amount <= highest:
+                raise BidError('Bid must be higher than the current highest bid')
+            if amount < highest + increment:
+                raise BidError(f'Bid must be at least {highest + increment:.2f}')
+
+        bid = Bid.objects.create(property=property_obj, bidder=bidder, amount=amount)
+        Property.objects.filter(id=property_obj.id).update(
+            highest_bid_amount=amount,
+            bid_count=F('bid_count') + 1,
+        )
+        payload = bid_payload(bid)
+        transaction.on_commit(
+            lambda: publish_property_event(property_obj.id, 'bid_placed', bid=payload)
+        )
+        return bid
+
+
+def _notify_bidders(bids):
+    """After commit, wake the notification inbox of everyone bidding in ``bids``."""
+    bidder_ids = set(bids.exclude(bidder=None).values_list('bidder_id', flat=True).distinct())
+
+    def publish():
+        for bidder_id in bidder_ids:
+            publish_user_event(bidder_id, 'notification')
+    transaction.on_commit(publish)
+
+
+BID_ACTIONS = {
+    'accept': 'accepted',
+    'reject': 'rejected',
+    'pending': 'pending',
+}
+
+
+def set_bid_status(bid_id, action):
+    """Apply an admin action to one bid and keep the auction summary in sync.
+
+    Accepting a bid rejects every other bid on the same property.
+    """
+    if action not in BID_ACTIONS:
+        raise BidError('Invalid action')
+    new_status = BID_ACTIONS[action]
+
+    with transaction.atomic():
+        try:
+            bid = Bid.objects.select_related('property', 'bidder').get(id=bid_id)
+        except Bid.DoesNotExist:
+            raise BidError('Bid not found', status_code=404)
+        property_obj = Property.objects.select_for_update().get(id=bid.property_id)
+
+        if new_status == 'accepted':
+            Bid.objects.filter(property_id=property_obj.id).exclude(id=bid.id).update(
+                status='rejected',
+                notified=False  # Reset notification status for rejected bids
+            )
+            property_obj.accepted_bid = bid
+        elif property_obj.accepted_bid_id == bid.id:
+            property_obj.accepted_bid = None
+        Property.objects.filter(id=property_obj.id).update(accepted_bid=property_obj.accepted_bid)
+
+        # Reset notification status when status changes
+        bid.status = new_status
+        bid.notified = False
+        bid.save(update_fields=['status', 'notified'])
+
+        payload = bid_payload(bid)
+        transaction.on_commit(
+            lambda: publish_property_event(property_obj.id, 'bid_status_changed', bid=payload)
+        )
+        if new_status == 'accepted':
+            _notify_bidders(Bid.objects.filter(property_id=property_obj.id))
+        elif new_status == 'rejected':
+            _notify_bidders(Bid.objects.filter(id=bid.id))
+        if new_status == 'accepted':
+            transaction.on_commit(
+                lambda: publish_property_event(
+                    property_obj.id, 'auction_closed', reason='bid_accepted', winning_bid=payload)
+            )
+        return bid
+
+
+def set_bid_statuses(actions):
+    """Apply many ``(bid_id, action)`` pairs in one transaction.
+
+    Statuses are written with one UPDATE per target status rather than a
+    save per bid. Accepting a bid still rejects every other bid on that
+    property; when one request accepts two bids on the same property,
+    neither is applied and both are reported as errors.
+    """
+    errors = []
+    requested = {}
+    for bid_id, action in actions:
+        if action not in BID_ACTIONS:
+            errors.append({'bid_id': bid_id, 'error': 'Invalid action'})
+            continue
+        requested[bid_id] = BID_ACTIONS[action]
+
+    with transaction.atomic():
+        bids = dict(Bid.objects.filter(id__in=list(requested)).values_list('id', 'property_id'))
+        for bid_id in requested:
+            if bid_id not in bids:
+                errors.append({'bid_id': bid_id, 'error': 'Bid not found'})
+        requested = {bid_id: new_status for bid_id, new_status in requested.items() if bid_id in bids}
+
+        property_ids = set(bids.values())
+        list(Property.objects.select_for_update().filter(id__in=property_ids).values_list('id'))
+
+        accepted = {}
+        for bid_id, new_status in requested.items():
+            if new_status == 'accepted':
+                accepted.setdefault(bids[bid_id], []).append(bid_id)
+        for prop_id, bid_ids in list(accepted.items()):
+            if len(bid_ids) > 1:
+                for bid_id in bid_ids:
+                    errors.append({'bid_id': bid_id, 'error': 'Only one bid per property can be accepted'})
+                    del requested[bid_id]
+                del accepted[prop_id]
+        winners = {prop_id: bid_ids[0] for prop_id, bid_ids in accepted.items()}
+
+        # An accept rejects the rest of its property, so other actions there are moot
+        by_status = {'rejected': [], 'pending': []}
+        for bid_id, new_status in requested.items():
+            if new_status != 'accepted' and bids[bid_id] not in winners:
+                by_status[new_status].append(bid_id)
+
+        for new_status, bid_ids in by_status.items():
+            if bid_ids:
+                Bid.objects.filter(id__in=bid_ids).update(status=new_status, notified=False)
+        if by_status['rejected'] or by_status['pending']:
+            Property.objects.filter(
+                accepted_bid__in=by_status['rejected'] + by_status['pending']
+            ).update(accepted_bid=None)
+
+        if winners:
+            Bid.objects.filter(property_id__in=list(winners)).exclude(id__in=list(winners.values())).update(
+                status='rejected', notified=False)
+            Bid.objects.filter(id__in=list(winners.values())).update(status='accepted', notified=False)
+            Property.objects.bulk_update(
+                [Property(id=prop_id, accepted_bid_id=bid_id) for prop_id, bid_id in winners.items()],
+                ['accepted_bid'],
+            )
+
+        _notify_bidders(Bid.objects.filter(
+            Q(id__in=by_status['rejected']) | Q(property_id__in=list(winners))
+        ))
+
+        changed = {}
+        for bid_id, new_status in requested.items():
+            if new_status == 'accepted' or bids[bid_id] not in winners:
+                changed.setdefault(bids[bid_id], []).append({'id': bid_id, 'status': new_status})
+        for prop_id, changes in changed.items():
+            transaction.on_commit(
+                lambda prop_id=prop_id, changes=changes: publish_property_event(
+                    prop_id, 'bids_status_changed', bids=changes)
+            )
+            if prop_id in winners:
+                transaction.on_commit(
+                    lambda prop_id=prop_id: publish_property_event(
+                        prop_id, 'auction_closed', reason='bid_accepted', winning_bid_id=winners[prop_id])
+                )
+
+    return {
+        'accepted': sorted(winners.values()),
+        'rejected': len(by_status['rejected']),
+        'pending': len(by_status['pending']),
+        'properties_closed': sorted(winners),
+        'errors': errors,
+    }
+
+
+def mark_bids_notified(bid_ids, bidder):
+    """Mark ``bidder``'s own bids among ``bid_ids`` as read; other ids are ignored."""
+    return Bid.objects.filter(id__in=bid_ids, bidder=bidder, notified=False).update(notified=True)
+
+
+def recompute_bid_stats(queryset=None):
+    """Recompute the denormalized auction summary with one set-based UPDATE."""
+    if queryset is None:
+        queryset = Property.objects.all()
+    bids = Bid.objects.filter(property=OuterRef('pk')).order_by()
+    return queryset.update(
+        highest_bid_amount=Subquery(
+            bids.values('property').annotate(m=Max('amount')).values('m')[:1]
+        ),
+        bid_count=Coalesce(
+            Subquery(
+                bids.values('property').annotate(c=Count('id')).values('c')[:1],
+                output_field=IntegerField(),
+            ),
+            Value(0),
+        ),
+        accepted_bid=Subquery(
+            bids.filter(status='accepted').order_by('-created_at').values('id')[:1]
+        ),
+    )
+
+
+def close_due_auctions(batch_size=200):
+    """Finalize every auction whose close time has passed.
+
+    Due auctions are found through the partial index on bidding_closes_at
+    and handled a batch at a time: per batch, the winners are chosen in one
+    query, then set-based UPDATEs accept them, reject every other bid and
+    mark the properties closed. Returns the number of auctions closed.
+    """
+    closed = 0
+    while True:
+        with transaction.atomic():
+            # Bids an admin already rejected can't win the auction
+            winner = (
+                Bid.objects.filter(property=OuterRef('pk')).exclude(status='rejected')
+                .order_by('-amount', 'created_at')
+                .values('id')[:1]
+            )
+            batch = list(
+                Property.objects.select_for_update()
+                .due_for_closing()
+                .order_by('bidding_closes_at')
+                .annotate(winner_id=Coalesce(F('accepted_bid'), Subquery(winner)))
+                .values_list('id', 'winner_id')[:batch_size]
+            )
+            if not batch:
+                return closed
+
+            now = timezone.now()
+            property_ids = [prop_id for prop_id, _ in batch]
+            winner_ids = [winner_id for _, winner_id in batch if winner_id is not None]
+
+            Bid.objects.filter(id__in=winner_ids).exclude(status='accepted').update(
+                status='accepted', notified=False)
+            Bid.objects.filter(property_id__in=property_ids).exclude(id__in=winner_ids).exclude(
+                status='rejected').update(status='rejected', notified=False)
+
+            # accepted_bid differs per row; winners without one go in one CASE update
+            Property.objects.filter(id__in=property_ids).update(auction_closed_at=now)
+            Property.objects.bulk_update(
+                [Property(id=prop_id, accepted_bid_id=winner_id) for prop_id, winner_id in batch],
+                ['accepted_bid'],
+            )
+
+            _notify_bidders(Bid.objects.filter(property_id__in=property_ids))
+            for prop_id, winner_id in batch:
+                transaction.on_commit(
+                    lambda prop_id=prop_id, winner_id=winner_id: publish_property_event(
+                        prop_id, 'auction_closed', reason='time_expired', winning_bid_id=winner_id)
+                )
+            closed += len(batch)
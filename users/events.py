@@ -0,0 +1,136 @@
+import asyncio
+import json
+import queue
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+# Seconds between keepalive frames on idle streams
+KEEPALIVE_INTERVAL = 15
+
+
+class Subscription:
+    """One listener's queue of events for a single property.
+
+    Events are published from sync request threads; a subscription created
+    inside an event loop receives them on an ``asyncio.Queue`` through
+    ``call_soon_threadsafe``, otherwise on a thread-safe ``queue.Queue``.
+    """
+
+    def __init__(self, broker, channel, maxsize=100):
+        self.broker = broker
+        self.channel = channel
+        try:
+            self._loop = asyncio.get_running_loop()
+            self._queue = asyncio.Queue(maxsize=maxsize)
+        except RuntimeError:
+            self._loop = None
+            self._queue = queue.Queue(maxsize=maxsize)
+
+    def put(self, event):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._put_nowait, event)
+        else:
+            self._put_nowait(event)
+
+    def _put_nowait(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except (asyncio.QueueFull, queue.Full):
+            # A slow client drops events rather than holding up publishers
+            pass
+
+    def get(self, timeout=None):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    async def aget(self, timeout=None):
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Fan out events to subscribers in this process.
+
+    Set ``BID_EVENT_BROKER`` to the import path of a class with the same
+    ``publish``/``subscribe``/``unsubscribe`` methods to use an external
+    broker when running more than one process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(event)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                broker_path = getattr(settings, 'BID_EVENT_BROKER', None)
+                _broker = import_string(broker_path)() if broker_path else InProcessBroker()
+    return _broker
+
+
+def property_channel(property_id):
+    return f'property:{property_id}'
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+def bid_payload(bid):
+    return {
+        'id': bid.id,
+        'amount': str(bid.amount),
+        'status': bid.status,
+        'created_at': bid.created_at.isoformat() if bid.created_at else None,
+        'bidder_email': bid.bidder.email if bid.bidder_id else None,
+    }
+
+
+def publish_property_event(property_id, event_type, **data):
+    get_broker().publish(property_channel(property_id), dict(data, type=event_type, property_id=property_id))
+
+
+def publish_user_event(user_id, event_type, **data):
+    get_broker().publish(user_channel(user_id), dict(data, type=event_type, user_id=user_id))
+
+
+def format_sse(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+class FilterError(ValueError):
+    pass
+
+
+def _int_param(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise FilterError(f"'{name}' must be an integer")
+
+
+def filter_properties(queryset, params):
+    """Apply the property feed query-string filters to ``queryset``."""
+    location = params.get('location')
+    if location:
+        queryset = queryset.filter(location=location)
+
+    range_filters = {
+        'min_bedrooms': 'bedrooms__gte',
+        'max_bedrooms': 'bedrooms__lte',
+        'min_bathrooms': 'bathrooms__gte',
+        'max_bathrooms': 'bathrooms__lte',
+        'min_price': 'actual_price__gte',
+        'max_price': 'actual_price__lte',
+    }
+    for param, lookup in range_filters.items():
+        value = _int_param(params, param)
+        if value is not None:
+            queryset = queryset.filter(**{lookup: value})
+
+    for param, lookup in (('min_area', 'area_sqft__gte'), ('max_area', 'area_sqft__lte')):
+        value = params.get(param)
+        if value in (None, ''):
+            continue
+        try:
+            value = float(value)
+        except ValueError:
+            raise FilterError(f"'{param}' must be a number of square feet")
+        queryset = queryset.filter(**{lookup: value})
+
+    listed_after = params.get('listed_after')
+    if listed_after:
+        try:
+            listed_after = datetime.strptime(listed_after, '%Y-%m-%d').date()
+        except ValueError:
+            raise FilterError("'listed_after' must use the format YYYY-MM-DD")
+        queryset = queryset.filter(date_listed__gte=listed_after)
+
+    bidding = params.get('bidding')
+    if bidding == 'open':
+        queryset = queryset.bidding_open()
+    elif bidding == 'closed':
+        queryset = queryset.bidding_closed()
+    elif bidding:
+        raise FilterError("'bidding' must be 'open' or 'closed'")
+
+    closing_within = _int_param(params, 'closing_within')
+    if closing_within is not None:
+        # Minutes until close, e.g. closing_within=60 for "the next hour"
+        queryset = queryset.closing_within(timedelta(minutes=closing_within))
+
+    return queryset
+
+
+def filter_bids_since(queryset, since):
+    """Keep only bids newer than ``since``, a bid id or an ISO 8601 timestamp."""
+    if not since:
+        return queryset
+    if since.isdigit():
+        return queryset.filter(id__gt=int(since))
+
+    try:
+        timestamp = parse_datetime(since)
+    except ValueError:
+        timestamp = None
+    if timestamp is None:
+        raise FilterError("'since' must be a bid id or an ISO 8601 timestamp")
+    if timezone.is_naive(timestamp):
+        timestamp = timezone.make_aware(timestamp)
+    return queryset.filter(created_at__gt=timestamp)
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 whose work factor comes from ``PASSWORD_PBKDF2_ITERATIONS``.
+
+    Keeps Django's ``pbkdf2_sha256`` algorithm name, so existing hashes keep
+    verifying; hashes stored at another iteration count are re-encoded on the
+    user's next successful login.
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_PBKDF2_ITERATIONS', PBKDF2PasswordHasher.iterations)
@@ -0,0 +1,240 @@
+import os
+import time
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db.models import Max, Q
+
+from PIL import ExifTags, Image, ImageOps, features
+
+from .models import PropertyImage
+
+
+# (name, longest edge in px), largest first: each variant is resized from
+# the previous one rather than from the full-size original
+IMAGE_VARIANTS = (
+    ('full', 1920),
+    ('card', 800),
+    ('thumbnail', 320),
+)
+VARIANT_QUALITY = 80
+VARIANT_DIR = 'property_images/variants'
+VARIANT_FIELDS = ['width', 'height', 'variants']
+
+
+class ImageError(ValueError):
+    pass
+
+
+def variant_format():
+    """WebP when this Pillow build can write it, JPEG otherwise."""
+    preferred = getattr(settings, 'PROPERTY_IMAGE_FORMAT', 'WEBP').upper()
+    if preferred == 'WEBP' and not features.check('webp'):
+        return 'JPEG'
+    return preferred
+
+
+def _encode(image, fmt):
+    if fmt == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    options = {'quality': VARIANT_QUALITY}
+    if fmt == 'WEBP':
+        options['method'] = 4
+    elif fmt == 'JPEG':
+        options.update(optimize=True, progressive=True)
+    image.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def create_variants(property_image, save=True):
+    """Write resized copies of ``property_image`` and record them on the row.
+
+    Returns False (leaving the row untouched) when the upload can't be
+    decoded, in which case clients keep using the original file. With
+    ``save=False`` the caller persists width, height and variants itself.
+    """
+    # Identical uploads share a stored file; reuse variants already made for it
+    sibling = (
+        PropertyImage.objects.filter(image=property_image.image.name)
+        .exclude(pk=property_image.pk).exclude(variants={})
+        .only('width', 'height', 'variants').first()
+    )
+    if sibling is not None:
+        property_image.width, property_image.height = sibling.width, sibling.height
+        property_image.variants = sibling.variants
+        if save:
+            property_image.save(update_fields=VARIANT_FIELDS)
+        return True
+
+    try:
+        with property_image.image.open('rb') as source:
+            image = Image.open(source)
+            # Record the original dimensions (as displayed, so after EXIF
+            # rotation) before draft() below shrinks the decoded size
+            width, height = image.size
+            if image.getexif().get(ExifTags.Base.Orientation) in (5, 6, 7, 8):
+                width, height = height, width
+            # JPEGs can decode straight at a reduced scale when every
+            # variant is much smaller than the original
+            largest = IMAGE_VARIANTS[0][1]
+            image.draft('RGB', (largest, largest))
+            image = ImageOps.exif_transpose(image)
+            image.load()
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return False
+
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+
+    fmt = variant_format()
+    extension = 'jpg' if fmt == 'JPEG' else fmt.lower()
+    stem = os.path.splitext(os.path.basename(property_image.image.name))[0]
+    storage = property_image.image.storage
+
+    variants = {}
+    current = image
+    previous = None
+    for name, edge in IMAGE_VARIANTS:
+        current = current.copy()
+        # thumbnail() keeps the aspect ratio and never upscales
+        current.thumbnail((edge, edge), Image.LANCZOS)
+        if previous is not None and (previous['width'], previous['height']) == current.size:
+            # Small originals: the larger variant already has this size
+            variants[name] = previous
+            continue
+        path = storage.save(
+            f'{VARIANT_DIR}/{stem}_{name}.{extension}',
+            ContentFile(_encode(current, fmt)),
+        )
+        variants[name] = previous = {'path': path, 'width': current.width, 'height': current.height}
+
+    property_image.width, property_image.height = width, height
+    property_image.variants = variants
+    if save:
+        property_image.save(update_fields=VARIANT_FIELDS)
+    return True
+
+
+def variant_srcset(property_image):
+    """Map variant name -> url and dimensions for the API."""
+    storage = property_image.image.storage
+    return {
+        name: {'url': storage.url(variant['path']), 'width': variant['width'], 'height': variant['height']}
+        for name, variant in (property_image.variants or {}).items()
+    }
+
+
+def media_gc_cutoff():
+    """Files modified after this timestamp are never deleted as unreferenced."""
+    return time.time() - getattr(settings, 'MEDIA_GC_GRACE', 3600)
+
+
+def referenced_paths(paths):
+    """The subset of ``paths`` still named by a PropertyImage original or variant.
+
+    Variants are content-addressed like originals, so two different uploads
+    can produce byte-identical variants and share the stored file.
+    """
+    paths = set(paths)
+    query = Q(image__in=paths)
+    for label, _ in IMAGE_VARIANTS:
+        query |= Q(**{f'variants__{label}__path__in': paths})
+    referenced = set()
+    for image, variants in PropertyImage.objects.filter(query).values_list('image', 'variants'):
+        referenced.add(image)
+        referenced.update(variant['path'] for variant in (variants or {}).values())
+    return paths & referenced
+
+
+def release_image_files(name, variants):
+    """Delete a deleted image's stored files that nothing references any more.
+
+    Returns the names actually deleted. A file touched within the media GC
+    grace window is left for gc_media: a concurrent identical upload only
+    refreshes the existing blob's mtime before its row is committed.
+    """
+    if not name:
+        return []
+    paths = {name} | {variant['path'] for variant in (variants or {}).values()}
+    storage = PropertyImage._meta.get_field('image').storage
+    cutoff = media_gc_cutoff()
+    deleted = []
+    for path in sorted(paths - referenced_paths(paths)):
+        try:
+            if os.stat(storage.path(path)).st_mtime > cutoff:
+                continue
+        except FileNotFoundError:
+            continue
+        storage.delete(path)
+        deleted.append(path)
+    return deleted
+
+
+def add_images(property_instance, files):
+    """Append uploads to the end of the gallery; returns the new rows.
+
+    Rows are inserted with one bulk INSERT, which also stores each file.
+    Variants are generated separately by process_images, normally from the
+    job queue (users.tasks).
+    """
+    if not files:
+        return []
+    last = property_instance.images.aggregate(last=Max('position'))['last']
+    start = 0 if last is None else last + 1
+    return PropertyImage.objects.bulk_create([
+        PropertyImage(property=property_instance, image=upload, position=start + offset)
+        for offset, upload in enumerate(files)
+    ])
+
+
+def process_images(rows):
+    """Generate variants for ``rows`` and write them back in one bulk UPDATE."""
+    processed = {}
+    for row in rows:
+        # The same file uploaded twice in one batch is processed once
+        first = processed.setdefault(row.image.name, row)
+        if first is not row:
+            row.width, row.height, row.variants = first.width, first.height, first.variants
+        else:
+            create_variants(row, save=False)
+    PropertyImage.objects.bulk_update(rows, VARIANT_FIELDS)
+    return len(rows)
+
+
+def _gallery_ids(property_instance, image_ids):
+    image_ids = list(dict.fromkeys(image_ids))
+    known = set(property_instance.images.filter(id__in=image_ids).values_list('id', flat=True))
+    unknown = [image_id for image_id in image_ids if image_id not in known]
+    if unknown:
+        raise ImageError(f"Images {unknown} do not belong to property {property_instance.id}")
+    return image_ids
+
+
+def remove_images(property_instance, image_ids):
+    """Delete the given gallery images; their files go once unreferenced."""
+    image_ids = _gallery_ids(property_instance, image_ids)
+    # Deleting rows fires post_delete, which releases the stored files
+    # after commit (users.signals)
+    deleted, _ = property_instance.images.filter(id__in=image_ids).delete()
+    return deleted
+
+
+def reorder_images(property_instance, image_ids):
+    """Put ``image_ids`` first, in that order; unlisted images keep their
+    relative order after them. Only rows whose position changes are written.
+    """
+    image_ids = _gallery_ids(property_instance, image_ids)
+    rank = {image_id: index for index, image_id in enumerate(image_ids)}
+    gallery = sorted(
+        property_instance.images.only('id', 'position'),
+        key=lambda row: (rank.get(row.id, len(rank)), row.position, row.id),
+    )
+    changed = []
+    for position, row in enumerate(gallery):
+        if row.position != position:
+            row.position = position
+            changed.append(row)
+    PropertyImage.objects.bulk_update(changed, ['position'])
+    return len(changed)
@@ -0,0 +1,105 @@
+import os
+import socket
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+
+# Task name -> callable taking the job payload as keyword arguments
+TASKS = {}
+
+
+def task(name):
+    def register(func):
+        TASKS[name] = func
+        return func
+    return register
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def enqueue(task_name, payload=None, max_attempts=3, delay=0):
+    """Queue ``task_name`` to run in a worker.
+
+    Call inside the transaction that writes the rows the task works on:
+    the job becomes visible to workers only when that transaction commits.
+    """
+    return Job.objects.create(
+        task=task_name,
+        payload=payload or {},
+        max_attempts=max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def retry_delay(attempts):
+    # Exponential backoff: base, 2 x base, 4 x base, ...
+    return timedelta(seconds=getattr(settings, 'JOB_RETRY_DELAY', 30) * 2 ** (attempts - 1))
+
+
+def claim_next_job(worker):
+    """Mark the next due job as running for ``worker`` and return it, or None."""
+    now = timezone.now()
+    due = (
+        Job.objects.filter(status=Job.QUEUED, run_at__lte=now)
+        .order_by('run_at', 'id').values_list('id', flat=True)[:10]
+    )
+    for job_id in due:
+        # The status check makes the claim atomic: of several workers racing
+        # for the same row, exactly one update matches
+        claimed = Job.objects.filter(id=job_id, status=Job.QUEUED).update(
+            status=Job.RUNNING, locked_by=worker, locked_at=now, attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.get(id=job_id)
+    return None
+
+
+def run_job(job):
+    """Run a claimed job and record the outcome; returns True on success."""
+    handler = TASKS.get(job.task)
+    try:
+        if handler is None:
+            raise LookupError(f"Unknown task '{job.task}'")
+        job.result = handler(**job.payload)
+    except Exception as e:
+        job.last_error = f'{type(e).__name__}: {e}'
+        if handler is not None and job.attempts < job.max_attempts:
+            job.status = Job.QUEUED
+            job.run_at = timezone.now() + retry_delay(job.attempts)
+        else:
+            job.status = Job.FAILED
+            job.finished_at = timezone.now()
+        succeeded = False
+    else:
+        job.status = Job.SUCCEEDED
+        job.last_error = ''
+        job.finished_at = timezone.now()
+        succeeded = True
+
+    job.locked_by = ''
+    job.locked_at = None
+    job.save(update_fields=[
+        'status', 'result', 'last_error', 'run_at', 'finished_at', 'locked_by', 'locked_at',
+    ])
+    return succeeded
+
+
+def requeue_stale_jobs():
+    """Give jobs held by crashed workers back to the queue (or fail them
+    once out of attempts). A job is stale after JOB_LEASE_TIMEOUT seconds.
+    """
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'JOB_LEASE_TIMEOUT', 600))
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, locked_by='', locked_at=None,
+        last_error='Worker stopped before finishing', finished_at=timezone.now(),
+    )
+    requeued = stale.update(status=Job.QUEUED, locked_by='', locked_at=None, run_at=timezone.now())
+    return requeued, failed
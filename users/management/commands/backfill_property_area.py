@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+
+from users.models import Property
+from users.utils import parse_area_sqft
+
+
+class Command(BaseCommand):
+    help = "Populate Property.area_sqft from the free-text size column in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Recompute every row instead of only rows without an area',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Property.objects.all()
+        if not options['all']:
+            queryset = queryset.filter(area_sqft__isnull=True)
+
+        updated = unparsed = 0
+        last_id = 0
+        while True:
+            # Walk the primary key so each batch is an indexed range scan
+            batch = list(
+                queryset.filter(id__gt=last_id).order_by('id').only('id', 'size')[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            changed = []
+            for prop in batch:
+                area = parse_area_sqft(prop.size)
+                if area is None:
+                    unparsed += 1
+                    continue
+                prop.area_sqft = area
+                changed.append(prop)
+            Property.objects.bulk_update(changed, ['area_sqft'])
+            updated += len(changed)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {updated} properties, {unparsed} sizes could not be parsed"
+        ))
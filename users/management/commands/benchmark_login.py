@@ -0,0 +1,62 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+
+class Command(BaseCommand):
+    help = "Measure password hashing cost and login endpoint throughput"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--iterations', type=int, default=None,
+                            help="PBKDF2 iterations to benchmark (default: PASSWORD_PBKDF2_ITERATIONS)")
+
+    def handle(self, *args, **options):
+        overrides = {'LOGIN_ATTEMPTS_PER_IP': None, 'LOGIN_FAILURES_PER_EMAIL': None}
+        if options['iterations']:
+            overrides['PASSWORD_PBKDF2_ITERATIONS'] = options['iterations']
+        with override_settings(**overrides):
+            self._run(options['requests'], options['concurrency'])
+
+    def _run(self, total, concurrency):
+        samples = 5
+        started = time.perf_counter()
+        for _ in range(samples):
+            make_password('benchmark-password')
+        hash_ms = (time.perf_counter() - started) / samples * 1000
+        self.stdout.write(f"hash: {hash_ms:.1f} ms per password")
+
+        # A throwaway account, removed again below
+        email = f'login-benchmark-{uuid.uuid4().hex[:12]}@example.com'
+        user = get_user_model().objects.create_user(
+            username='Login Benchmark', email=email, password='benchmark-password',
+        )
+        try:
+            def login(_):
+                client = Client(HTTP_HOST='localhost')
+                response = client.post(
+                    '/api/auth/login/',
+                    {'email': email, 'password': 'benchmark-password'},
+                    content_type='application/json',
+                )
+                return response.status_code
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                codes = list(pool.map(login, range(total)))
+            elapsed = time.perf_counter() - started
+        finally:
+            user.delete()
+
+        failures = sum(1 for code in codes if code != 200)
+        self.stdout.write(
+            f"login: {total} requests, concurrency {concurrency}: "
+            f"{total / elapsed:.1f} req/s, {elapsed / total * 1000:.1f} ms avg"
+            + (f", {failures} failed" if failures else "")
+        )
@@ -0,0 +1,51 @@
+import time
+import warnings
+
+from django.core.management.base import BaseCommand
+
+from users.prediction import encode_features, predict_matrix, price_model_registry
+
+
+class Command(BaseCommand):
+    help = "Compare single-row prediction latency of the sklearn path and the fast evaluator"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        import numpy as np
+        import pandas as pd
+
+        iterations = options['iterations']
+        # Feature-name mismatch warnings depend on how the artifacts were fit
+        warnings.filterwarnings('ignore', category=UserWarning)
+        loaded = price_model_registry.get()
+        record = {'size': 1500, 'bedrooms': 3, 'location': 'urban'}
+        row = encode_features(record)
+        columns = ['size', 'bedrooms', 'location_urban', 'location_suburban', 'location_rural']
+
+        def dataframe_path():
+            features = pd.DataFrame([row], columns=columns)
+            return loaded.model.predict(loaded.scaler.transform(features))[0]
+
+        def numpy_path():
+            return predict_matrix(loaded.model, loaded.scaler, np.array([row], dtype=float))[0]
+
+        def evaluator_path():
+            return loaded.evaluator(encode_features(record))
+
+        paths = []
+        if loaded.model is not None:
+            paths += [('pandas + sklearn', dataframe_path), ('numpy + sklearn', numpy_path)]
+        if loaded.evaluator is not None:
+            paths.append(('evaluator', evaluator_path))
+        else:
+            self.stdout.write(self.style.WARNING("No fast evaluator for this model type"))
+
+        for name, func in paths:
+            func()
+            start = time.perf_counter()
+            for _ in range(iterations):
+                result = func()
+            elapsed = (time.perf_counter() - start) / iterations * 1e6
+            self.stdout.write(f"{name:<18} {elapsed:10.1f} us/prediction  -> {result:.2f}")
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.bidding import close_due_auctions
+
+
+class Command(BaseCommand):
+    help = "Finalize auctions past their close time: accept the winning bid, reject the rest"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Keep running and check for due auctions every INTERVAL seconds',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            closed = close_due_auctions(batch_size=options['batch_size'])
+            if closed or not options['interval']:
+                self.stdout.write(self.style.SUCCESS(f"Closed {closed} auctions"))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
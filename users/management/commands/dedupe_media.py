@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+
+from users.models import PropertyImage
+from users.storage import is_content_addressed
+
+
+class Command(BaseCommand):
+    help = "Move property images and their variants to content-addressed names, merging duplicates"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        storage = PropertyImage._meta.get_field('image').storage
+        renamed = {}
+        missing = set()
+
+        def adopt(name):
+            """Return the content-addressed name for the legacy file ``name``."""
+            if name in renamed or name in missing:
+                return renamed.get(name, name)
+            if not storage.exists(name):
+                missing.add(name)
+                self.stderr.write(f"Missing file {name}, left as is")
+                return name
+            if dry_run:
+                renamed[name] = name
+                return name
+            with storage.open(name, 'rb') as source:
+                # Hashes while copying; identical content lands on one name
+                renamed[name] = storage.save(name, source)
+            return renamed[name]
+
+        rows = 0
+        for property_image in PropertyImage.objects.order_by('id').iterator():
+            names = [property_image.image.name] + [
+                variant['path'] for variant in property_image.variants.values()
+            ]
+            if all(is_content_addressed(name) for name in names):
+                continue
+            rows += 1
+            if not is_content_addressed(property_image.image.name):
+                property_image.image.name = adopt(property_image.image.name)
+            for variant in property_image.variants.values():
+                if not is_content_addressed(variant['path']):
+                    variant['path'] = adopt(variant['path'])
+            if not dry_run:
+                property_image.save(update_fields=['image', 'variants'])
+
+        legacy = [name for name, new_name in renamed.items() if new_name != name]
+        blobs = set(renamed.values())
+        freed = 0
+        for name in legacy:
+            freed += storage.size(name)
+            storage.delete(name)
+
+        verb = "Would move" if dry_run else "Moved"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {len(renamed)} files from {rows} images into {len(blobs)} content-addressed files"
+            + ("" if dry_run else f", freed {freed / 1024:.0f} KB")
+        ))
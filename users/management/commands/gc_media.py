@@ -0,0 +1,51 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from users.models import PropertyImage
+
+
+class Command(BaseCommand):
+    help = "Delete files under property_images/ that no PropertyImage row references"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true')
+        parser.add_argument(
+            '--grace', type=int, default=getattr(settings, 'MEDIA_GC_GRACE', 3600),
+            help='Keep unreferenced files modified within this many seconds (in-flight uploads)',
+        )
+
+    def handle(self, *args, **options):
+        storage = PropertyImage._meta.get_field('image').storage
+        upload_to = PropertyImage._meta.get_field('image').upload_to.rstrip('/')
+
+        referenced = set()
+        for name, variants in PropertyImage.objects.values_list('image', 'variants').iterator():
+            referenced.add(name)
+            referenced.update(variant['path'] for variant in (variants or {}).values())
+
+        cutoff = time.time() - options['grace']
+        root = storage.path(upload_to)
+        deleted = freed = 0
+        for dirpath, dirnames, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                name = os.path.relpath(path, storage.location).replace(os.sep, '/')
+                if name in referenced:
+                    continue
+                stat = os.stat(path)
+                if stat.st_mtime > cutoff:
+                    continue
+                deleted += 1
+                freed += stat.st_size
+                if options['dry_run']:
+                    self.stdout.write(f"Would delete {name}")
+                else:
+                    os.unlink(path)
+
+        verb = "Would delete" if options['dry_run'] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {deleted} unreferenced files ({freed / 1024:.0f} KB)"
+        ))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from users.images import create_variants
+from users.models import PropertyImage
+
+
+class Command(BaseCommand):
+    help = "Generate resized thumbnail/card/full variants for property images"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Regenerate every image instead of only images without variants',
+        )
+
+    def handle(self, *args, **options):
+        queryset = PropertyImage.objects.all()
+        if not options['all']:
+            queryset = queryset.filter(variants={})
+
+        processed = failed = 0
+        last_id = 0
+        while True:
+            batch = list(queryset.filter(id__gt=last_id).order_by('id')[:options['batch_size']])
+            if not batch:
+                break
+            last_id = batch[-1].id
+            for property_image in batch:
+                if create_variants(property_image):
+                    processed += 1
+                else:
+                    failed += 1
+                    self.stderr.write(f"Could not decode {property_image.image.name}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated variants for {processed} images, {failed} could not be decoded"
+        ))
@@ -0,0 +1,53 @@
+import multiprocessing
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from users.prediction import ModelRegistry, encode_features, predict_one
+
+
+def _memory_kb():
+    usage = {}
+    for path in ('/proc/self/status', '/proc/self/smaps_rollup'):
+        try:
+            with open(path) as f:
+                for line in f:
+                    key, _, value = line.partition(':')
+                    if key in ('VmRSS', 'RssAnon', 'RssFile', 'Pss'):
+                        usage[key] = int(value.split()[0])
+        except OSError:
+            pass
+    return usage
+
+
+def _worker(mmap, queue):
+    before = _memory_kb()
+    with override_settings(PRICE_MODEL_MMAP=mmap):
+        loaded = ModelRegistry().get()
+        predict_one(loaded, encode_features({'size': 1500, 'bedrooms': 3, 'location': 'urban'}))
+    after = _memory_kb()
+    queue.put({key: after.get(key, 0) - before.get(key, 0) for key in after})
+
+
+class Command(BaseCommand):
+    help = "Report per-worker memory used by the loaded price model, with and without mmap"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+
+    def handle(self, *args, **options):
+        context = multiprocessing.get_context('fork')
+        for mmap in (False, True):
+            queue = context.Queue()
+            workers = [context.Process(target=_worker, args=(mmap, queue)) for _ in range(options['workers'])]
+            for worker in workers:
+                worker.start()
+            results = [queue.get() for _ in workers]
+            for worker in workers:
+                worker.join()
+
+            label = 'mmap' if mmap else 'no mmap'
+            for key in ('VmRSS', 'RssAnon', 'RssFile', 'Pss'):
+                values = [r[key] for r in results if key in r]
+                if values:
+                    self.stdout.write(f"{label:<8} {key:<8} +{sum(values) / len(values) / 1024:8.1f} MB per worker")
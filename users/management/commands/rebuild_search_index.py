@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from users.models import Property
+from users.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the property full-text search index from the Property table"
+
+    def handle(self, *args, **options):
+        get_search_backend().rebuild(Property.objects.all())
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt"))
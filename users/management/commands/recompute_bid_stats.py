@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from users.bidding import recompute_bid_stats
+from users.models import Property
+
+
+class Command(BaseCommand):
+    help = "Recompute highest_bid_amount, bid_count and accepted_bid for properties"
+
+    def add_arguments(self, parser):
+        parser.add_argument('property_ids', nargs='*', type=int)
+
+    def handle(self, *args, **options):
+        queryset = Property.objects.all()
+        if options['property_ids']:
+            queryset = queryset.filter(id__in=options['property_ids'])
+        updated = recompute_bid_stats(queryset)
+        self.stdout.write(self.style.SUCCESS(f"Recomputed bid stats for {updated} properties"))
@@ -0,0 +1,57 @@
+import time
+import traceback
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from users import tasks  # noqa: F401 -- registers the task handlers
+from users.jobs import claim_next_job, requeue_stale_jobs, run_job, worker_name
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs; start several processes for more throughput"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Seconds to wait before polling again when the queue is empty',
+        )
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty')
+        parser.add_argument('--max-jobs', type=int, default=0, help='Exit after this many jobs')
+
+    def handle(self, *args, **options):
+        worker = worker_name()
+        handled = 0
+        last_sweep = 0
+        while True:
+            close_old_connections()
+            if time.monotonic() - last_sweep > 60:
+                requeued, failed = requeue_stale_jobs()
+                if requeued or failed:
+                    self.stdout.write(f"Requeued {requeued} stale jobs, failed {failed}")
+                last_sweep = time.monotonic()
+
+            job = claim_next_job(worker)
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+                continue
+
+            started = time.perf_counter()
+            try:
+                succeeded = run_job(job)
+            except Exception:
+                # Recording the outcome failed; the lease timeout requeues it
+                self.stderr.write(traceback.format_exc())
+                continue
+            elapsed = (time.perf_counter() - started) * 1000
+            if succeeded:
+                self.stdout.write(f"{job} done in {elapsed:.0f} ms")
+            else:
+                self.stderr.write(f"{job} attempt {job.attempts}/{job.max_attempts}: {job.last_error}")
+
+            handled += 1
+            if options['max_jobs'] and handled >= options['max_jobs']:
+                break
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker} handled {handled} jobs"))
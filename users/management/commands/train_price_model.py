@@ -0,0 +1,104 @@
+from collections import Counter
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression, SGDRegressor
+from sklearn.preprocessing import StandardScaler
+
+from users.prediction import LOCATIONS
+from users.training import iter_training_chunks, regression_metrics, save_artifacts
+
+
+class Command(BaseCommand):
+    help = "Train the price model from the Property table and write versioned artifacts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--estimator', choices=['linear', 'sgd', 'forest'], default='linear',
+            help="'sgd' trains incrementally with partial_fit and never holds the full dataset",
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--epochs', type=int, default=5, help='Passes over the data for --estimator sgd')
+        parser.add_argument('--n-estimators', type=int, default=100)
+        parser.add_argument('--activate', action='store_true', help='Point the live model (CURRENT) at this version')
+        parser.add_argument(
+            '--allow-unmapped-locations', action='store_true',
+            help='Train even when no location maps onto a model category (the model then ignores location)',
+        )
+        parser.add_argument(
+            '--compress', type=int, default=0, choices=range(0, 10), metavar='0-9',
+            help='joblib compression level for model.pkl (compressed pickles cannot be memory-mapped)',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        scaler = StandardScaler()
+
+        # First pass: fit the scaler incrementally and count rows
+        n_train = n_test = 0
+        unmapped = Counter()
+        for X_train, y_train, X_test, y_test in iter_training_chunks(chunk_size, unmapped=unmapped):
+            if len(X_train):
+                scaler.partial_fit(X_train)
+            n_train += len(X_train)
+            n_test += len(X_test)
+        if not n_train:
+            raise CommandError("No properties with a parsed area and price to train on")
+
+        # Free-text locations only count when they map onto a category
+        # (see users.prediction.location_category)
+        n_unmapped = sum(unmapped.values())
+        if n_unmapped:
+            examples = ', '.join(repr(location) for location, _ in unmapped.most_common(5))
+            message = (
+                f"{n_unmapped} of {n_train + n_test} rows have a location matching none of "
+                f"{', '.join(LOCATIONS)} (e.g. {examples}); add them to PRICE_LOCATION_ALIASES"
+            )
+            if n_unmapped == n_train + n_test and not options['allow_unmapped_locations']:
+                raise CommandError(
+                    message + ", or pass --allow-unmapped-locations to train a model that ignores location")
+            self.stderr.write(self.style.WARNING(message))
+        self.stdout.write(f"Training on {n_train} rows, evaluating on {n_test}")
+
+        if options['estimator'] == 'sgd':
+            model = SGDRegressor(random_state=42)
+            for epoch in range(options['epochs']):
+                for X_train, y_train, _, _ in iter_training_chunks(chunk_size):
+                    if len(X_train):
+                        model.partial_fit(scaler.transform(X_train), y_train)
+        else:
+            # These estimators need the full matrix, but as compact float
+            # arrays built chunk by chunk rather than a DataFrame of models
+            X = np.empty((n_train, len(scaler.mean_)))
+            y = np.empty(n_train)
+            offset = 0
+            for X_train, y_train, _, _ in iter_training_chunks(chunk_size):
+                X[offset:offset + len(X_train)] = scaler.transform(X_train)
+                y[offset:offset + len(y_train)] = y_train
+                offset += len(X_train)
+
+            if options['estimator'] == 'forest':
+                model = RandomForestRegressor(
+                    n_estimators=options['n_estimators'], random_state=42, n_jobs=-1)
+            else:
+                model = LinearRegression()
+            model.fit(X, y)
+            del X, y
+
+        y_true, y_pred = [], []
+        for _, _, X_test, y_test in iter_training_chunks(chunk_size):
+            if len(X_test):
+                y_true.append(y_test)
+                y_pred.append(model.predict(scaler.transform(X_test)))
+        metrics = regression_metrics(
+            np.concatenate(y_true) if y_true else np.empty(0),
+            np.concatenate(y_pred) if y_pred else np.empty(0),
+        )
+        metrics.update(estimator=options['estimator'], n_train=n_train, n_test=n_test,
+                       unmapped_locations=n_unmapped)
+
+        version, path = save_artifacts(
+            model, scaler, metrics, activate=options['activate'], compress=options['compress'])
+        self.stdout.write(self.style.SUCCESS(f"Saved model version {version} to {path}"))
+        self.stdout.write(f"Metrics: {metrics}")
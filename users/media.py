@@ -0,0 +1,150 @@
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from .cache import LRUCache
+from .storage import is_content_addressed
+
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# (path, mtime_ns, size) -> sha256 for files whose name isn't already a hash
+etag_cache = LRUCache(max_size=getattr(settings, 'MEDIA_ETAG_CACHE_SIZE', 10000), ttl=24 * 3600)
+
+
+class _FileRange:
+    """``length`` bytes of an open file, starting at its current offset.
+
+    Exposes fileno() so a wsgi.file_wrapper that uses sendfile (gunicorn)
+    can send the range without copying it through Python; such servers take
+    the start from the file offset and the length from Content-Length.
+    """
+
+    def __init__(self, file, length):
+        self._file = file
+        self._remaining = length
+
+    def read(self, size=-1):
+        size = self._remaining if size is None or size < 0 else min(size, self._remaining)
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def close(self):
+        self._file.close()
+
+
+def _etag(path, name, stat):
+    if is_content_addressed(name):
+        digest = posixpath.splitext(posixpath.basename(name))[0]
+    else:
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        digest = etag_cache.get(key)
+        if digest is None:
+            sha256 = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    sha256.update(chunk)
+            digest = sha256.hexdigest()
+            etag_cache.set(key, digest)
+    return f'"{digest}"'
+
+
+def _byte_range(request, size, etag, last_modified):
+    """Return (start, end) for a single satisfiable range request, None to
+    send the whole file, or False when the range can't be satisfied.
+    """
+    header = request.META.get('HTTP_RANGE', '')
+    match = RANGE_RE.match(header.strip())
+    if not match or not any(match.groups()):
+        # Absent, malformed or multi-range: the full file is a valid answer
+        return None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and if_range not in (etag, last_modified):
+        return None
+
+    first, last = match.groups()
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve an uploaded file with validators, caching headers and ranges.
+
+    Content-addressed names (users.storage) never change content, so they
+    are cached as immutable; other files revalidate after
+    MEDIA_CACHE_MAX_AGE seconds. With MEDIA_SENDFILE_HEADER set
+    ('X-Accel-Redirect' or 'X-Sendfile') the front-end server sends the
+    body itself from MEDIA_SENDFILE_ROOT + path.
+    """
+    name = posixpath.normpath(path).lstrip('/')
+    # Temporary upload files (users.storage) and other dotfiles stay private
+    if any(part.startswith('.') for part in name.split('/')):
+        raise Http404
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, name)
+        stat = os.stat(full_path)
+    except (OSError, ValueError):
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    etag = _etag(full_path, name, stat)
+    last_modified = http_date(stat.st_mtime)
+    headers = HttpResponse()
+    headers['ETag'] = etag
+    headers['Last-Modified'] = last_modified
+    headers['Cache-Control'] = (
+        IMMUTABLE_CACHE_CONTROL if is_content_addressed(name)
+        else f"public, max-age={getattr(settings, 'MEDIA_CACHE_MAX_AGE', 3600)}"
+    )
+    conditional = get_conditional_response(request, etag, int(stat.st_mtime), headers)
+    if conditional is not headers:
+        return conditional
+
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    sendfile_header = getattr(settings, 'MEDIA_SENDFILE_HEADER', None)
+    if sendfile_header:
+        response = HttpResponse(content_type=content_type)
+        root = str(getattr(settings, 'MEDIA_SENDFILE_ROOT', settings.MEDIA_ROOT)).rstrip('/')
+        response[sendfile_header] = f'{root}/{name}'
+    else:
+        byte_range = _byte_range(request, stat.st_size, etag, last_modified)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+        f = open(full_path, 'rb')
+        if byte_range is None:
+            response = FileResponse(f, content_type=content_type)
+        else:
+            start, end = byte_range
+            f.seek(start)
+            response = FileResponse(_FileRange(f, end - start + 1), content_type=content_type, status=206)
+            response['Content-Length'] = end - start + 1
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Accept-Ranges'] = 'bytes'
+
+    for header in ('ETag', 'Last-Modified', 'Cache-Control'):
+        response[header] = headers[header]
+    return response
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0022_property_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='area_sqft',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+
+FTS_TABLE = 'users_property_fts'
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Property = apps.get_model('users', 'Property')
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} '
+        "USING fts5(location, address, description, tokenize='unicode61')"
+    )
+    for row in Property.objects.values_list('id', 'location', 'address', 'description').iterator():
+        schema_editor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, location, address, description) VALUES (%s, %s, %s, %s)',
+            [row[0], row[1] or '', row[2] or '', row[3] or ''],
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0023_property_area_sqft'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
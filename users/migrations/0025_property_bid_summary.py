@@ -0,0 +1,47 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_bid_summary(apps, schema_editor):
+    Property = apps.get_model('users', 'Property')
+    Bid = apps.get_model('users', 'Bid')
+    for prop in Property.objects.all().iterator():
+        bids = Bid.objects.filter(property=prop).order_by('-amount')
+        highest = bids.first()
+        accepted = bids.filter(status='accepted').order_by('-created_at').first()
+        prop.highest_bid_amount = highest.amount if highest else None
+        prop.bid_count = bids.count()
+        prop.accepted_bid = accepted
+        prop.save(update_fields=['highest_bid_amount', 'bid_count', 'accepted_bid'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0024_property_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='accepted_bid',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='users.bid'),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='bid_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='highest_bid_amount',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['-bid_count', '-id'], name='property_hot_idx'),
+        ),
+        migrations.RunPython(populate_bid_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:47
+
+from datetime import datetime, timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def populate_close_time(apps, schema_editor):
+    Property = apps.get_model('users', 'Property')
+    properties = list(Property.objects.filter(date_listed__isnull=False).only('id', 'date_listed'))
+    for prop in properties:
+        listed = timezone.make_aware(datetime.combine(prop.date_listed, datetime.min.time()))
+        prop.bidding_closes_at = listed + timedelta(days=2)
+    Property.objects.bulk_update(properties, ['bidding_closes_at'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0026_bid_history_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='auction_closed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='bidding_closes_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('auction_closed_at__isnull', True)), fields=['bidding_closes_at'], name='property_due_close_idx'),
+        ),
+        migrations.RunPython(populate_close_time, migrations.RunPython.noop),
+    ]
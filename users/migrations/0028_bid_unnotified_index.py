@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0027_auction_close_time'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bid',
+            index=models.Index(condition=models.Q(('notified', False)), fields=['bidder', 'notified', '-created_at'], name='bid_unnotified_idx'),
+        ),
+    ]
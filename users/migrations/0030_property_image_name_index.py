@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0029_property_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='propertyimage',
+            name='image',
+            field=models.ImageField(db_index=True, upload_to='property_images/'),
+        ),
+    ]
@@ -4,6 +4,8 @@ from django.conf import settings
 from decimal import Decimal
 from datetime import datetime, timedelta
 from django.utils import timezone
+from django.utils.dateparse import parse_date
+from .utils import parse_area_sqft
 
 
 class CustomUser(AbstractUser):
@@ -31,42 +33,130 @@ class CustomUser(AbstractUser):
 
 
 
+# How long an auction stays open after the listing date
+BIDDING_DURATION = timedelta(days=2)
+
+
+def bidding_closes_at(date_listed):
+    """Close time for a listing: midnight of date_listed plus BIDDING_DURATION."""
+    if not date_listed:
+        return None
+    if isinstance(date_listed, str):
+        date_listed = parse_date(date_listed)
+        if date_listed is None:
+            return None
+    if isinstance(date_listed, datetime):
+        listing_date = date_listed
+        if timezone.is_naive(listing_date):
+            listing_date = timezone.make_aware(listing_date)
+    else:
+        listing_date = timezone.make_aware(datetime.combine(date_listed, datetime.min.time()))
+    return listing_date + BIDDING_DURATION
+
+
 def upload_path(instance, filename):
     return '/'.join(['images', str(instance.address)]) + filename
 
+class PropertyQuerySet(models.QuerySet):
+    def with_related(self):
+        # Everything PropertySerializer nests, fetched in bulk per page
+        return self.prefetch_related('images')
+
+    # Auctions close at the stored bidding_closes_at, so these are range
+    # conditions on an indexed column rather than per-row Python
+    def bidding_closed(self):
+        return self.filter(bidding_closes_at__lt=timezone.now())
+
+    def bidding_open(self):
+        # exclude() keeps rows without a close time, which never close
+        return self.exclude(bidding_closes_at__lt=timezone.now())
+
+    def closing_within(self, delta):
+        now = timezone.now()
+        return self.filter(bidding_closes_at__gt=now, bidding_closes_at__lte=now + delta)
+
+    def due_for_closing(self):
+        return self.filter(auction_closed_at__isnull=True, bidding_closes_at__lt=timezone.now())
+
+
 class Property(models.Model):
     location = models.CharField(max_length=255)
     address = models.TextField()
     size = models.CharField(max_length=50)
+    # Normalized from size so range filters and sorts can run in SQL
+    area_sqft = models.FloatField(null=True, blank=True, db_index=True)
     bedrooms = models.IntegerField()
     bathrooms = models.IntegerField()
     actual_price = models.IntegerField(default=0)
     owner_name = models.CharField(max_length=255, null=True, blank=True)
     date_listed = models.DateField(null=True, blank=True)
     description = models.TextField(null=True, blank=True)
+    # Auction summary maintained by users.bidding on every bid write;
+    # recompute_bid_stats repairs them if bids are changed elsewhere
+    highest_bid_amount = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    bid_count = models.PositiveIntegerField(default=0)
+    accepted_bid = models.ForeignKey(
+        'Bid', null=True, blank=True, on_delete=models.SET_NULL, related_name='+'
+    )
+    # Derived from date_listed on save; auction_closed_at is set once the
+    # close_auctions command has picked a winner
+    bidding_closes_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    auction_closed_at = models.DateTimeField(null=True, blank=True)
     # images = models.ImageField(null=True, blank=True, upload_to=upload_path)  # New field
 
+    objects = PropertyQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['location', '-id'], name='property_location_idx'),
+            models.Index(fields=['actual_price'], name='property_price_idx'),
+            models.Index(fields=['date_listed'], name='property_date_listed_idx'),
+            models.Index(fields=['bedrooms', 'bathrooms'], name='property_rooms_idx'),
+            models.Index(fields=['-bid_count', '-id'], name='property_hot_idx'),
+            models.Index(
+                fields=['bidding_closes_at'],
+                name='property_due_close_idx',
+                condition=models.Q(auction_closed_at__isnull=True),
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.area_sqft = parse_area_sqft(self.size)
+        self.bidding_closes_at = bidding_closes_at(self.date_listed)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'size' in update_fields:
+                update_fields.add('area_sqft')
+            if 'date_listed' in update_fields:
+                update_fields.add('bidding_closes_at')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
     @property
     def is_bidding_closed(self):
-        if not self.date_listed:
+        closes_at = self.bidding_closes_at or bidding_closes_at(self.date_listed)
+        if closes_at is None:
             return False
-        
-        # Convert date_listed to datetime if it's just a date
-        if isinstance(self.date_listed, datetime):
-            listing_date = self.date_listed
-        else:
-            listing_date = datetime.combine(self.date_listed, datetime.min.time())
-            listing_date = timezone.make_aware(listing_date)
-        
-        # Calculate end date (2 days after listing)
-        end_date = listing_date + timedelta(days=2)
-        return timezone.now() > end_date
+        return timezone.now() > closes_at
 
    
    
 class PropertyImage(models.Model):
     property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name="images")
-    image = models.ImageField(upload_to="property_images/")
+    # Indexed: identical uploads share one stored file, and the number of
+    # rows naming it is that file's reference count
+    image = models.ImageField(upload_to="property_images/", db_index=True)
+    # Original dimensions and the resized copies written by
+    # users.images.create_variants: {name: {path, width, height}}
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    variants = models.JSONField(default=dict, blank=True)
+    # Gallery order within the property
+    position = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['position', 'id']
 
 
 
@@ -86,6 +176,20 @@ class Bid(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['property', 'created_at'], name='bid_property_created_idx'),
+            models.Index(fields=['created_at'], name='bid_created_idx'),
+            # Notification inbox: rows marked notified drop out of the index.
+            # New bids start unread, so every pending bid is in it too; the
+            # condition can't also exclude them because SQLite only uses a
+            # partial index when the query repeats its literals, and Django
+            # binds the status as a parameter
+            models.Index(
+                fields=['bidder', 'notified', '-created_at'],
+                name='bid_unnotified_idx',
+                condition=models.Q(notified=False),
+            ),
+        ]
 
     def __str__(self):
         return f"Bid of {self.amount} on {self.property}"
@@ -94,4 +198,49 @@ class Bid(models.Model):
         # Ensure amount is Decimal before saving
         if isinstance(self.amount, str):
             self.amount = Decimal(self.amount.replace(',', ''))
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+
+class Job(models.Model):
+    """A unit of background work, run by `manage.py run_jobs` workers."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    )
+
+    task = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    result = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Workers poll for due jobs; finished rows stay out of the index
+            models.Index(
+                fields=['run_at', 'id'],
+                name='job_queued_idx',
+                condition=models.Q(status='queued'),
+            ),
+            models.Index(
+                fields=['locked_at'],
+                name='job_running_idx',
+                condition=models.Q(status='running'),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task} job #{self.id} ({self.status})"
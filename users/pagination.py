@@ -0,0 +1,63 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class PropertyCursorPagination(CursorPagination):
+    # Keyset pagination on the primary key: every page is an indexed range
+    # scan, so latency stays flat no matter how many listings exist
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = '-id'
+
+
+class HotPropertyPagination(LimitOffsetPagination):
+    # sort=hot orders by bid_count, which ties and changes as bids arrive.
+    # CursorPagination positions on the first ordering field only, so its
+    # cursors skip or repeat tied listings. Offsets over the unique
+    # (-bid_count, -id) order are exact for a given snapshot; a listing
+    # can still move between pages when its bid_count changes meanwhile.
+    # The view applies ``ordering``; LimitOffsetPagination doesn't.
+    default_limit = 20
+    max_limit = 100
+    ordering = ('-bid_count', '-id')
+
+
+class BidCursorPagination(CursorPagination):
+    # Newest first, walking the (property, created_at) / created_at indexes
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created_at', '-id')
+
+
+class SearchPagination:
+    # Search hits come from a ranked index rather than a queryset, so this
+    # pages a (total, hits) pair using limit/offset query parameters
+    default_limit = 20
+    max_limit = 100
+
+    def get_limit_offset(self, request):
+        try:
+            limit = int(request.query_params.get('limit', self.default_limit))
+            offset = int(request.query_params.get('offset', 0))
+        except ValueError:
+            raise ValueError("'limit' and 'offset' must be integers")
+        return max(1, min(limit, self.max_limit)), max(0, offset)
+
+    def get_paginated_data(self, request, total, hits, limit, offset):
+        url = request.build_absolute_uri()
+        next_url = previous_url = None
+        if offset + limit < total:
+            next_url = replace_query_param(url, 'offset', offset + limit)
+        if offset > 0:
+            if offset - limit <= 0:
+                previous_url = remove_query_param(url, 'offset')
+            else:
+                previous_url = replace_query_param(url, 'offset', offset - limit)
+        return {
+            'count': total,
+            'next': next_url,
+            'previous': previous_url,
+            'results': hits,
+        }
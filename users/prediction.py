@@ -0,0 +1,430 @@
+import csv
+import hashlib
+import io
+import itertools
+import json
+import os
+import threading
+import time
+import warnings
+from collections import namedtuple
+
+from django.conf import settings
+
+try:
+    import joblib
+    import numpy as np
+except ImportError:
+    joblib = None
+    np = None
+
+from .cache import LRUCache
+from .utils import parse_area_sqft
+
+
+LOCATIONS = ['urban', 'suburban', 'rural']
+FEATURE_COLUMNS = ['size', 'bedrooms'] + [f'location_{loc}' for loc in LOCATIONS]
+MAX_BATCH_SIZE = 1000
+
+
+def encode_features(record):
+    """Turn one ``{size, bedrooms, location}`` record into a feature row.
+
+    Raises ValueError with a user-facing message when the record is invalid.
+    """
+    if not isinstance(record, dict):
+        raise ValueError('Each record must be an object')
+
+    size = parse_area_sqft(record.get('size'))
+    if size is None:
+        raise ValueError('Invalid size')
+    try:
+        bedrooms = int(record.get('bedrooms'))
+    except (TypeError, ValueError):
+        raise ValueError('Invalid bedrooms')
+    location = location_category(record.get('location'))
+
+    return [size, bedrooms] + [1 if loc == location else 0 for loc in LOCATIONS]
+
+
+def location_category(location):
+    """Map a location onto one of ``LOCATIONS``, or None when nothing matches.
+
+    Listings store free text ('Lahore', 'Multan Pakistan') while the model
+    knows only the three categories. A category name matches directly;
+    otherwise the ``PRICE_LOCATION_ALIASES`` setting, a ``{text: category}``
+    dict, is searched for a case-insensitive substring of the location.
+    """
+    location = str(location or '').strip().lower()
+    if location in LOCATIONS:
+        return location
+    for text, category in getattr(settings, 'PRICE_LOCATION_ALIASES', {}).items():
+        if text.lower() in location and category in LOCATIONS:
+            return category
+    return None
+
+
+def build_feature_matrix(records):
+    """Validate ``records`` in one pass and stack the valid ones into a matrix.
+
+    Returns ``(matrix, indexes, errors)`` where ``indexes`` maps matrix rows
+    back to positions in ``records`` and ``errors`` lists the rejected rows.
+    """
+    rows, indexes, errors = [], [], []
+    for index, record in enumerate(records):
+        try:
+            rows.append(encode_features(record))
+            indexes.append(index)
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+
+    matrix = np.array(rows, dtype=float).reshape(len(rows), len(FEATURE_COLUMNS))
+    return matrix, indexes, errors
+
+
+def predict_matrix(model, scaler, matrix):
+    if not len(matrix):
+        return np.empty(0)
+    with warnings.catch_warnings():
+        # The scaler was fitted on a DataFrame; the column order of the
+        # matrix matches FEATURE_COLUMNS so the names check is redundant
+        warnings.filterwarnings('ignore', message='X does not have valid feature names')
+        return model.predict(scaler.transform(matrix))
+
+
+def read_csv_records(uploaded_file, limit=MAX_BATCH_SIZE):
+    """Parse at most ``limit + 1`` rows, enough for callers to reject oversized uploads."""
+    text = io.TextIOWrapper(uploaded_file, encoding='utf-8-sig')
+    return list(itertools.islice(csv.DictReader(text), limit + 1))
+
+
+class PriceEvaluator:
+    """Plain-Python replica of ``model.predict(scaler.transform(row))``.
+
+    Single predictions are a handful of multiply-adds; going through
+    sklearn's input validation costs far more than the arithmetic. The
+    fitted parameters are copied into lists once when the model is loaded.
+    """
+
+    def __init__(self, scaler):
+        n = scaler.n_features_in_
+        self.means = list(map(float, scaler.mean_)) if scaler.mean_ is not None else [0.0] * n
+        self.scales = list(map(float, scaler.scale_)) if scaler.scale_ is not None else [1.0] * n
+
+    def scale(self, row):
+        return [(x - mean) / scale for x, mean, scale in zip(row, self.means, self.scales)]
+
+    def __call__(self, row):
+        return self.predict_scaled(self.scale(row))
+
+    def predict_scaled(self, scaled):
+        raise NotImplementedError
+
+
+class LinearPriceEvaluator(PriceEvaluator):
+    def __init__(self, model, scaler):
+        super().__init__(scaler)
+        self.coef = list(map(float, model.coef_))
+        self.intercept = float(model.intercept_)
+
+    def predict_scaled(self, scaled):
+        return sum(c * x for c, x in zip(self.coef, scaled)) + self.intercept
+
+
+class ForestPriceEvaluator(PriceEvaluator):
+    """Tree-ensemble evaluator over flat node arrays.
+
+    All trees are concatenated into one set of compact arrays (``roots``
+    holds each tree's first node) which can be written as ``.npy`` files
+    and memory-mapped read-only, so every worker process shares the same
+    physical pages instead of unpickling its own copy of the forest.
+    """
+
+    ARRAYS = ('roots', 'left', 'right', 'feature', 'threshold', 'value')
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, scaler, arrays):
+        super().__init__(scaler)
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+
+    @classmethod
+    def from_model(cls, model, scaler):
+        estimators = getattr(model, 'estimators_', [model])
+        trees = [estimator.tree_ for estimator in estimators]
+        sizes = [tree.node_count for tree in trees]
+        roots = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int32)
+
+        left, right = [], []
+        for root, tree in zip(roots, trees):
+            # Re-base child pointers onto the concatenated arrays, keeping -1 for leaves
+            left.append(np.where(tree.children_left == -1, -1, tree.children_left + root))
+            right.append(np.where(tree.children_right == -1, -1, tree.children_right + root))
+
+        arrays = {
+            'roots': roots,
+            'left': np.concatenate(left).astype(np.int32),
+            'right': np.concatenate(right).astype(np.int32),
+            'feature': np.concatenate([tree.feature for tree in trees]).astype(np.int32),
+            'threshold': np.concatenate([tree.threshold for tree in trees]),
+            'value': np.concatenate([tree.value[:, 0, 0] for tree in trees]),
+        }
+        return cls(scaler, arrays)
+
+    def save(self, directory, source_digest=None):
+        os.makedirs(directory, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(directory, f'{name}.npy'), np.ascontiguousarray(getattr(self, name)))
+        with open(os.path.join(directory, self.MANIFEST), 'w') as f:
+            json.dump({'model_sha256': source_digest}, f)
+
+    @classmethod
+    def load(cls, directory, scaler, mmap_mode='r'):
+        arrays = {
+            name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mmap_mode)
+            for name in cls.ARRAYS
+        }
+        return cls(scaler, arrays)
+
+    @classmethod
+    def read_manifest(cls, directory):
+        try:
+            with open(os.path.join(directory, cls.MANIFEST)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def predict_scaled(self, scaled):
+        return float(self.predict_scaled_matrix(np.array([scaled], dtype=float))[0])
+
+    def predict_matrix(self, matrix):
+        means = np.array(self.means)
+        scales = np.array(self.scales)
+        return self.predict_scaled_matrix((np.asarray(matrix, dtype=float) - means) / scales)
+
+    def predict_scaled_matrix(self, scaled):
+        # sklearn trees compare features after casting them to float32
+        scaled = scaled.astype(np.float32).astype(np.float64)
+        n_rows, n_trees = len(scaled), len(self.roots)
+        rows = np.repeat(np.arange(n_rows), n_trees)
+        nodes = np.tile(np.asarray(self.roots, dtype=np.int64), n_rows)
+
+        # Walk every (row, tree) pair one level per iteration
+        active = np.flatnonzero(self.left[nodes] != -1)
+        while len(active):
+            current = nodes[active]
+            go_left = scaled[rows[active], self.feature[current]] <= self.threshold[current]
+            nodes[active] = np.where(go_left, self.left[current], self.right[current])
+            active = active[self.left[nodes[active]] != -1]
+
+        return self.value[nodes].reshape(n_rows, n_trees).mean(axis=1)
+
+
+def build_evaluator(model, scaler):
+    """Return a fast evaluator for ``model``, or None to use sklearn directly."""
+    if not hasattr(scaler, 'mean_') or not hasattr(scaler, 'n_features_in_'):
+        return None
+    if hasattr(model, 'coef_') and hasattr(model, 'intercept_') and getattr(model.coef_, 'ndim', 0) == 1:
+        return LinearPriceEvaluator(model, scaler)
+    if hasattr(model, 'tree_') or (
+        hasattr(model, 'estimators_') and all(hasattr(t, 'tree_') for t in model.estimators_)
+        and type(model).__name__ in ('RandomForestRegressor', 'ExtraTreesRegressor')
+    ):
+        if getattr(model, 'n_outputs_', 1) == 1:
+            return ForestPriceEvaluator.from_model(model, scaler)
+    return None
+
+
+def predict_one(loaded, row):
+    if loaded.evaluator is not None:
+        return loaded.evaluator(row)
+    return float(predict_matrix(loaded.model, loaded.scaler, np.array([row], dtype=float))[0])
+
+
+def predict_rows(loaded, matrix):
+    # Forests served from memory-mapped arrays have no sklearn model loaded
+    if loaded.model is None:
+        if not len(matrix):
+            return np.empty(0)
+        return loaded.evaluator.predict_matrix(matrix)
+    return predict_matrix(loaded.model, loaded.scaler, matrix)
+
+
+def model_dir():
+    return getattr(settings, 'PRICE_MODEL_DIR', os.path.join(settings.BASE_DIR, 'ml_models'))
+
+
+class ModelNotAvailable(Exception):
+    pass
+
+
+LoadedModel = namedtuple('LoadedModel', ['model', 'scaler', 'evaluator', 'version', 'loaded_at'])
+
+
+class ModelRegistry:
+    """Process-wide holder for the price model and its scaler.
+
+    Artifacts are unpickled once, on first use, and shared by every request
+    in the process. The files are re-stat'ed at most every
+    ``check_interval`` seconds and reloaded when they change on disk.
+
+    The live artifacts are the version directory named in the ``CURRENT``
+    pointer file (written by users.training.activate_version); without a
+    pointer, the top-level model.pkl/scaler.pkl are used. Version
+    directories are never modified once written, so swapping the pointer
+    switches model, scaler and exported arrays together.
+    """
+
+    check_interval = 5.0
+    POINTER = 'CURRENT'
+
+    def __init__(self, model_path=None, scaler_path=None):
+        self._model_path = model_path
+        self._scaler_path = scaler_path
+        self._lock = threading.Lock()
+        self._loaded = None
+        self._signature = None
+        self._last_check = 0.0
+        self._reload_listeners = []
+
+    def artifact_dir(self):
+        """The directory holding the live model.pkl, scaler.pkl and model_arrays/."""
+        try:
+            with open(os.path.join(model_dir(), self.POINTER)) as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            version = ''
+        return os.path.join(model_dir(), 'versions', version) if version else model_dir()
+
+    def _paths(self):
+        directory = self.artifact_dir()
+        model_path = self._model_path or os.path.join(directory, 'model.pkl')
+        scaler_path = self._scaler_path or os.path.join(directory, 'scaler.pkl')
+        return model_path, scaler_path, os.path.join(os.path.dirname(model_path), 'model_arrays')
+
+    @property
+    def model_path(self):
+        return self._paths()[0]
+
+    @property
+    def scaler_path(self):
+        return self._paths()[1]
+
+    @property
+    def arrays_dir(self):
+        return self._paths()[2]
+
+    def get(self):
+        loaded = self._loaded
+        if loaded is not None and time.monotonic() - self._last_check < self.check_interval:
+            return loaded
+
+        with self._lock:
+            self._last_check = time.monotonic()
+            # Resolve the pointer once so this check and load see one version
+            paths = self._paths()
+            try:
+                signature = self._file_signature(paths)
+            except OSError as e:
+                if self._loaded is not None:
+                    # Keep serving the last good model while files are replaced
+                    return self._loaded
+                raise ModelNotAvailable(
+                    "ML models not found. Please ensure model.pkl and scaler.pkl "
+                    "are in the ml_models directory."
+                ) from e
+
+            if self._loaded is None or signature != self._signature:
+                previous = self._loaded
+                self._loaded = self._load(paths)
+                self._signature = signature
+                if previous is not None and previous.version != self._loaded.version:
+                    for listener in self._reload_listeners:
+                        listener(self._loaded)
+            return self._loaded
+
+    def add_reload_listener(self, listener):
+        """Call ``listener(loaded_model)`` whenever a new artifact version is loaded."""
+        self._reload_listeners.append(listener)
+
+    def reload(self):
+        with self._lock:
+            self._signature = None
+            self._last_check = 0.0
+        return self.get()
+
+    @property
+    def version(self):
+        loaded = self._loaded
+        return loaded.version if loaded else None
+
+    @staticmethod
+    def _file_signature(paths):
+        model_path, scaler_path, arrays_dir = paths
+        stats = [os.stat(path) for path in (model_path, scaler_path)]
+        manifest = os.path.join(arrays_dir, ForestPriceEvaluator.MANIFEST)
+        if os.path.exists(manifest):
+            stats.append(os.stat(manifest))
+        return (model_path,) + tuple((stat.st_mtime_ns, stat.st_size) for stat in stats)
+
+    @staticmethod
+    def _sha256(path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _load(self, paths):
+        if joblib is None:
+            raise ModelNotAvailable('Required libraries not available')
+
+        model_path, scaler_path, arrays_dir = paths
+        model_digest = self._sha256(model_path)
+        scaler_digest = self._sha256(scaler_path)
+        version = hashlib.sha256((model_digest + scaler_digest).encode()).hexdigest()[:12]
+        mmap_mode = 'r' if getattr(settings, 'PRICE_MODEL_MMAP', True) else None
+
+        scaler = joblib.load(scaler_path)
+        manifest = ForestPriceEvaluator.read_manifest(arrays_dir)
+        if manifest and manifest.get('model_sha256') == model_digest:
+            # The exported forest arrays answer every prediction, so the
+            # pickled sklearn forest is never unpickled in this process
+            model = None
+            evaluator = ForestPriceEvaluator.load(arrays_dir, scaler, mmap_mode=mmap_mode)
+        else:
+            # Compressed pickles can't be mapped; joblib then loads them normally
+            with warnings.catch_warnings():
+                warnings.filterwarnings('ignore', message='.*mmap_mode.*')
+                model = joblib.load(model_path, mmap_mode=mmap_mode)
+            evaluator = build_evaluator(model, scaler)
+
+        return LoadedModel(
+            model=model,
+            scaler=scaler,
+            evaluator=evaluator,
+            version=version,
+            loaded_at=time.time(),
+        )
+
+
+price_model_registry = ModelRegistry()
+
+
+class PredictionCache(LRUCache):
+    """LRU/TTL cache for single-row predictions.
+
+    Keys include the model version so a reloaded model never serves stale
+    prices; the cache is also emptied when the registry reloads.
+    """
+
+    @staticmethod
+    def make_key(version, row):
+        return (version,) + tuple(float(x) for x in row)
+
+
+prediction_cache = PredictionCache(
+    max_size=getattr(settings, 'PRICE_PREDICTION_CACHE_SIZE', 4096),
+    ttl=getattr(settings, 'PRICE_PREDICTION_CACHE_TTL', 3600),
+)
+price_model_registry.add_reload_listener(prediction_cache.clear)
@@ -0,0 +1,48 @@
+import asyncio
+import json
+import re
+
+from asgiref.sync import sync_to_async
+
+from .events import KEEPALIVE_INTERVAL, get_broker, property_channel
+from .models import Property
+
+
+BID_SOCKET_PATH = re.compile(r'^/ws/property/(?P<property_id>\d+)/bids/?$')
+
+
+async def bid_websocket(scope, receive, send):
+    """Raw ASGI websocket endpoint streaming bid events for one property."""
+    match = BID_SOCKET_PATH.match(scope['path'])
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+    if not match:
+        await send({'type': 'websocket.close', 'code': 4404})
+        return
+
+    property_id = int(match.group('property_id'))
+    exists = await sync_to_async(Property.objects.filter(id=property_id).exists)()
+    if not exists:
+        await send({'type': 'websocket.close', 'code': 4404})
+        return
+
+    await send({'type': 'websocket.accept'})
+    subscription = get_broker().subscribe(property_channel(property_id))
+
+    async def forward_events():
+        while True:
+            event = await subscription.aget(timeout=KEEPALIVE_INTERVAL)
+            if event is None:
+                event = {'type': 'keepalive'}
+            await send({'type': 'websocket.send', 'text': json.dumps(event)})
+
+    sender = asyncio.ensure_future(forward_events())
+    try:
+        while True:
+            message = await receive()
+            if message['type'] == 'websocket.disconnect':
+                break
+    finally:
+        sender.cancel()
+        subscription.close()
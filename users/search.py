@@ -0,0 +1,151 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.module_loading import import_string
+
+
+FTS_TABLE = 'users_property_fts'
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# FTS5 wraps matches in these control characters instead of HTML tags, so
+# the snippet can be escaped before the markers become <b>...</b>
+_MATCH_START, _MATCH_END = '\x02', '\x03'
+
+
+class SearchBackend:
+    """Interface for property search indexes.
+
+    ``search`` returns ``(total, hits)`` where each hit is a dict with the
+    property ``id`` and a short ``snippet`` of matching text. Snippets are
+    HTML: the property text is escaped and matches are wrapped in ``<b>``.
+    """
+
+    def index_property(self, property_obj):
+        raise NotImplementedError
+
+    def remove_property(self, property_id):
+        raise NotImplementedError
+
+    def rebuild(self, queryset):
+        for property_obj in queryset.iterator():
+            self.index_property(property_obj)
+
+    def search(self, query, limit, offset=0):
+        raise NotImplementedError
+
+
+class DatabaseSearchBackend(SearchBackend):
+    # Fallback for databases without a configured full-text index: no
+    # ranking, but still only ids and snippets leave the database layer
+    fields = ('location', 'address', 'description')
+
+    def index_property(self, property_obj):
+        pass
+
+    def remove_property(self, property_id):
+        pass
+
+    def rebuild(self, queryset):
+        pass
+
+    def search(self, query, limit, offset=0):
+        from .models import Property
+
+        condition = Q()
+        for token in _TOKEN_RE.findall(query):
+            token_match = Q()
+            for field in self.fields:
+                token_match |= Q(**{f'{field}__icontains': token})
+            condition &= token_match
+
+        queryset = Property.objects.filter(condition).order_by('-id')
+        total = queryset.count()
+        hits = [
+            {'id': row['id'], 'snippet': _plain_snippet(row, self.fields)}
+            for row in queryset.values('id', *self.fields)[offset:offset + limit]
+        ]
+        return total, hits
+
+
+class SQLiteFTSSearchBackend(SearchBackend):
+    """Ranked prefix search over an FTS5 table keyed by property id."""
+
+    def index_property(self, property_obj):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [property_obj.id])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, location, address, description) '
+                'VALUES (%s, %s, %s, %s)',
+                [
+                    property_obj.id,
+                    property_obj.location or '',
+                    property_obj.address or '',
+                    property_obj.description or '',
+                ],
+            )
+
+    def remove_property(self, property_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [property_id])
+
+    def rebuild(self, queryset):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        super().rebuild(queryset)
+
+    def search(self, query, limit, offset=0):
+        match = self.build_match(query)
+        if not match:
+            return 0, []
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+                [match],
+            )
+            total = cursor.fetchone()[0]
+            # Weight location and address above the free-form description
+            cursor.execute(
+                f"SELECT rowid, snippet({FTS_TABLE}, -1, %s, %s, '...', 12) "
+                f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY bm25({FTS_TABLE}, 3.0, 2.0, 1.0) LIMIT %s OFFSET %s',
+                [_MATCH_START, _MATCH_END, match, limit, offset],
+            )
+            hits = [{'id': row[0], 'snippet': _highlight(row[1])} for row in cursor.fetchall()]
+        return total, hits
+
+    @staticmethod
+    def build_match(query):
+        # Quote every token so user input can't inject FTS syntax, and make
+        # each one a prefix match
+        tokens = _TOKEN_RE.findall(query)
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _highlight(snippet):
+    # Escape the user-entered text first, then turn the markers into tags
+    return (
+        escape(snippet or '')
+        .replace(_MATCH_START, '<b>')
+        .replace(_MATCH_END, '</b>')
+    )
+
+
+def _plain_snippet(row, fields, length=120):
+    for field in fields:
+        if row.get(field):
+            return escape(row[field][:length])
+    return ''
+
+
+def get_search_backend():
+    backend_path = getattr(settings, 'PROPERTY_SEARCH_BACKEND', None)
+    if backend_path:
+        return import_string(backend_path)()
+    if connection.vendor == 'sqlite':
+        return SQLiteFTSSearchBackend()
+    return DatabaseSearchBackend()
@@ -1,7 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth import authenticate
-from .models import CustomUser, Property, PropertyImage, Bid
+from .models import Property, PropertyImage, Bid, Job
+from .images import variant_srcset
 from decimal import Decimal
 from decimal import InvalidOperation
 import re
@@ -31,21 +32,11 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 class LoginSerializer(serializers.Serializer):
+    # Credentials are checked by LoginView (users.authentication.acheck_credentials)
+    # so the password hash runs off the request thread
     email = serializers.EmailField()
     password = serializers.CharField(write_only=True)
 
-    def validate(self, data):
-        try:
-            user = CustomUser.objects.get(email=data['email'])
-            if user and user.check_password(data['password']):
-                # Make sure the user object has all required fields
-                user.refresh_from_db()  # Refresh the user object from the database
-                return user
-        except CustomUser.DoesNotExist:
-            pass
-        
-        raise serializers.ValidationError("Invalid email or password")
-
 
 
 
@@ -59,16 +50,21 @@ class LoginSerializer(serializers.Serializer):
 
 class PropertyImageSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = PropertyImage
-        fields = ['id', 'image', 'image_url']
+        fields = ['id', 'image', 'image_url', 'width', 'height', 'srcset']
 
     def get_image_url(self, obj):
         if obj.image:
             return obj.image.url
         return None
 
+    def get_srcset(self, obj):
+        # Empty until variants exist; clients fall back to image_url
+        return variant_srcset(obj)
+
 class PropertySerializer(serializers.ModelSerializer):
     images = PropertyImageSerializer(many=True, read_only=True)
     bidding_closed = serializers.SerializerMethodField()
@@ -87,8 +83,11 @@ class PropertySerializer(serializers.ModelSerializer):
             'date_listed',
             'description',
             'images',
-            'bidding_closed'
+            'bidding_closed',
+            'highest_bid_amount',
+            'bid_count',
         ]
+        read_only_fields = ['highest_bid_amount', 'bid_count']
 
     def get_bidding_closed(self, obj):
         return obj.is_bidding_closed
@@ -128,10 +127,9 @@ class BidSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Invalid bid amount")
 
     def create(self, validated_data):
-        email = self.context.get('email')
-        if email:
-            user = CustomUser.objects.get(email=email)
-            validated_data['bidder'] = user
+        request = self.context.get('request')
+        if 'bidder' not in validated_data and request is not None and request.user.is_authenticated:
+            validated_data['bidder'] = request.user
         
         # Ensure amount is Decimal
         if 'amount' in validated_data:
@@ -140,4 +138,11 @@ class BidSerializer(serializers.ModelSerializer):
             except InvalidOperation:
                 raise serializers.ValidationError({"amount": "Invalid bid amount"})
                 
-        return super().create(validated_data)
\ No newline at end of file
+        return super().create(validated_data)
+
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = ['id', 'task', 'status', 'attempts', 'max_attempts', 'run_at',
+                  'last_error', 'result', 'created_at', 'finished_at']
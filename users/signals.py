@@ -0,0 +1,50 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_token, invalidate_user_tokens
+from .bidding import recompute_bid_stats
+from .images import release_image_files
+from .models import Bid, CustomUser, Property, PropertyImage
+from .search import get_search_backend
+
+
+@receiver(post_save, sender=Property)
+def index_property(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    get_search_backend().index_property(instance)
+
+
+@receiver(post_delete, sender=Property)
+def unindex_property(sender, instance, **kwargs):
+    get_search_backend().remove_property(instance.id)
+
+
+@receiver(post_delete, sender=Bid)
+def refresh_bid_stats(sender, instance, **kwargs):
+    # place_bid only ever raises the summary; deletes (e.g. the bidder
+    # CASCADE when a user is removed) must lower it again
+    recompute_bid_stats(Property.objects.filter(id=instance.property_id))
+
+
+@receiver(post_delete, sender=PropertyImage)
+def release_property_image(sender, instance, **kwargs):
+    # After commit, so a rolled-back delete never loses the file
+    transaction.on_commit(partial(release_image_files, instance.image.name, instance.variants))
+
+
+@receiver(post_delete, sender=Token)
+def uncache_token(sender, instance, **kwargs):
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def uncache_user_tokens(sender, instance, **kwargs):
+    # Role toggles, deactivation and deletion must not be served from cache
+    invalidate_user_tokens(instance.pk)
@@ -0,0 +1,68 @@
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+
+
+CONTENT_NAME_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+def content_name(directory, digest, extension):
+    # Fan out on the first two hex digits to keep directories small
+    return posixpath.join(directory, digest[:2], digest + extension)
+
+
+def is_content_addressed(name):
+    stem = posixpath.splitext(posixpath.basename(name))[0]
+    return bool(CONTENT_NAME_RE.match(stem))
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """File storage that keeps each distinct file once, named by its SHA-256.
+
+    ``property_images/photo.jpg`` is stored as
+    ``property_images/3f/3fa9…c2.jpg``; saving the same bytes again returns
+    the existing name without writing a second copy. Deleting files is left
+    to the callers that know whether a blob is still referenced
+    (users.images.release_image_files).
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # The final name depends on the content and is chosen in _save
+        return name
+
+    def _save(self, name, content):
+        directory, basename = posixpath.split(name.replace('\\', '/'))
+        extension = posixpath.splitext(basename)[1].lower()
+        upload_dir = self.path(directory)
+        os.makedirs(upload_dir, exist_ok=True)
+
+        # Hash while streaming into a temporary file next to the target, so
+        # the upload is read once and the final rename stays on one device
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=upload_dir, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    tmp.write(chunk)
+
+            name = content_name(directory, digest.hexdigest(), extension)
+            full_path = self.path(name)
+            if os.path.exists(full_path):
+                # Refresh the mtime so gc_media's grace period covers a blob
+                # that was just referenced again
+                os.utime(full_path)
+            else:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                os.chmod(tmp_path, self.file_permissions_mode or 0o644)
+                # Atomic: readers never see a partially written blob
+                os.replace(tmp_path, full_path)
+                tmp_path = None
+        finally:
+            if tmp_path is not None:
+                os.unlink(tmp_path)
+        return name
@@ -0,0 +1,17 @@
+from .images import process_images
+from .jobs import enqueue, task
+from .models import PropertyImage
+
+
+@task('process_property_images')
+def process_property_images(image_ids):
+    # Images deleted while the job waited are simply skipped
+    rows = list(PropertyImage.objects.filter(id__in=image_ids))
+    return {'processed': process_images(rows)}
+
+
+def queue_image_processing(rows):
+    """Queue variant generation for freshly added images; returns the Job or None."""
+    if not rows:
+        return None
+    return enqueue('process_property_images', {'image_ids': [row.id for row in rows]})
@@ -1,3 +1,618 @@
-from django.test import TestCase
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import caches
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from . import bidding, jobs
+from .images import release_image_files
+from .authentication import CachedTokenAuthentication, token_cache
+from .media import _byte_range
+from .throttling import client_ip
+from .search import DatabaseSearchBackend, SQLiteFTSSearchBackend
+from .models import Bid, CustomUser, Job, Property, PropertyImage
+
+
+class PropertyQueryCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        for i in range(5):
+            prop = Property.objects.create(
+                location='Lahore', address=f'House {i}', size='5 Marla',
+                bedrooms=3, bathrooms=2, actual_price=1000000,
+            )
+            for j in range(3):
+                PropertyImage.objects.create(property=prop, image=f'property_images/{i}_{j}.jpg')
+
+    def test_property_feed_query_count_is_constant(self):
+        # One query for the page of properties, one for all of their images
+        with self.assertNumQueries(2):
+            response = self.client.get('/properties/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_property_detail_query_count(self):
+        prop = Property.objects.first()
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/property/edit/{prop.id}/')
+        self.assertEqual(len(response.data['images']), 3)
+
+
+class PriceEvaluatorEquivalenceTests(TestCase):
+    def setUp(self):
+        import numpy as np
+
+        rng = np.random.RandomState(0)
+        self.rows = np.column_stack([
+            rng.uniform(500, 5000, 200),
+            rng.randint(1, 7, 200),
+            rng.randint(0, 2, (200, 3)),
+        ]).astype(float)
+        self.prices = self.rows[:, 0] * 100 + self.rows[:, 1] * 50000 + rng.normal(0, 5000, 200)
+
+    def assert_matches_sklearn(self, model, scaler):
+        from .prediction import build_evaluator, predict_matrix
+
+        evaluator = build_evaluator(model, scaler)
+        self.assertIsNotNone(evaluator)
+        expected = predict_matrix(model, scaler, self.rows)
+        for row, price in zip(self.rows.tolist(), expected):
+            self.assertAlmostEqual(evaluator(row), price, places=6)
+
+    def test_shipped_artifacts(self):
+        from .prediction import ModelRegistry
+
+        loaded = ModelRegistry().get()
+        self.assert_matches_sklearn(loaded.model, loaded.scaler)
+
+    def test_random_forest(self):
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.preprocessing import StandardScaler
+
+        scaler = StandardScaler().fit(self.rows)
+        model = RandomForestRegressor(n_estimators=10, random_state=0)
+        model.fit(scaler.transform(self.rows), self.prices)
+        self.assert_matches_sklearn(model, scaler)
+
+
+class ConcurrentBidTests(TransactionTestCase):
+    def setUp(self):
+        self.property = Property.objects.create(
+            location='Lahore', address='Auction House', size='10 Marla',
+            bedrooms=4, bathrooms=3, actual_price=1000, date_listed=timezone.now().date(),
+        )
+        self.users = [
+            CustomUser.objects.create_user(username=f'Bidder {i}', email=f'bidder{i}@example.com', password='x')
+            for i in range(8)
+        ]
+
+    def test_parallel_bids_only_accept_strictly_increasing_amounts(self):
+        amounts = [Decimal(1000 + (i * 37) % 300) for i in range(200)]
+        accepted = []
+        lock = threading.Lock()
+
+        def bid(index, amount):
+            try:
+                placed = bidding.place_bid(self.property.id, self.users[index % len(self.users)], amount)
+            except bidding.BidError:
+                return
+            finally:
+                connection.close()
+            with lock:
+                accepted.append(placed)
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            list(pool.map(bid, range(len(amounts)), amounts))
+
+        bids = list(Bid.objects.filter(property=self.property).order_by('id'))
+        self.assertEqual(len(bids), len(accepted))
+        self.assertTrue(bids)
+        for previous, current in zip(bids, bids[1:]):
+            self.assertGreater(current.amount, previous.amount)
+
+
+class ByteRangeTests(SimpleTestCase):
+    etag = '"abc"'
+    last_modified = 'Sun, 18 Oct 2026 14:01:29 GMT'
+
+    def byte_range(self, size=1000, **headers):
+        request = RequestFactory().get('/media/x', **headers)
+        return _byte_range(request, size, self.etag, self.last_modified)
+
+    def test_no_or_unsupported_range_sends_whole_file(self):
+        self.assertIsNone(self.byte_range())
+        self.assertIsNone(self.byte_range(HTTP_RANGE='bytes=0-1,5-6'))
+        self.assertIsNone(self.byte_range(HTTP_RANGE='items=0-10'))
+        self.assertIsNone(self.byte_range(HTTP_RANGE='bytes=-'))
+
+    def test_explicit_and_open_ended_ranges(self):
+        self.assertEqual(self.byte_range(HTTP_RANGE='bytes=0-99'), (0, 99))
+        self.assertEqual(self.byte_range(HTTP_RANGE='bytes=900-'), (900, 999))
+        # The end is clamped to the last byte
+        self.assertEqual(self.byte_range(HTTP_RANGE='bytes=990-5000'), (990, 999))
+
+    def test_suffix_ranges(self):
+        self.assertEqual(self.byte_range(HTTP_RANGE='bytes=-10'), (990, 999))
+        # A suffix longer than the file is the whole file
+        self.assertEqual(self.byte_range(HTTP_RANGE='bytes=-5000'), (0, 999))
+        self.assertIs(self.byte_range(HTTP_RANGE='bytes=-0'), False)
+
+    def test_unsatisfiable_ranges(self):
+        self.assertIs(self.byte_range(HTTP_RANGE='bytes=1000-'), False)
+        self.assertIs(self.byte_range(HTTP_RANGE='bytes=500-100'), False)
+        self.assertIs(self.byte_range(size=0, HTTP_RANGE='bytes=0-0'), False)
+
+    def test_if_range(self):
+        self.assertEqual(self.byte_range(HTTP_RANGE='bytes=5-9', HTTP_IF_RANGE=self.etag), (5, 9))
+        self.assertEqual(
+            self.byte_range(HTTP_RANGE='bytes=5-9', HTTP_IF_RANGE=self.last_modified), (5, 9)
+        )
+        # A stale validator means the client's partial copy is outdated
+        self.assertIsNone(self.byte_range(HTTP_RANGE='bytes=5-9', HTTP_IF_RANGE='"other"'))
+
+    def test_unsatisfiable_range_response(self):
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            with open(os.path.join(media_root, 'file.bin'), 'wb') as f:
+                f.write(b'x' * 100)
+            response = self.client.get('/media/file.bin', HTTP_RANGE='bytes=100-')
+            self.assertEqual(response.status_code, 416)
+            self.assertEqual(response['Content-Range'], 'bytes */100')
+            response = self.client.get('/media/file.bin', HTTP_RANGE='bytes=-10')
+            self.assertEqual(response.status_code, 206)
+            self.assertEqual(b''.join(response.streaming_content), b'x' * 10)
+
+
+class ReleaseImageFilesTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.media_root = media_root.name
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, MEDIA_GC_GRACE=3600)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.property = Property.objects.create(
+            location='Lahore', address='House 1', size='5 Marla',
+            bedrooms=3, bathrooms=2, actual_price=1000000,
+        )
+
+    def blob(self, name, age=7200):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(name.encode())
+        modified = time.time() - age
+        os.utime(path, (modified, modified))
+        return name
+
+    def image(self, name, card=None):
+        variants = {'card': {'path': card, 'width': 800, 'height': 600}} if card else {}
+        return PropertyImage.objects.create(property=self.property, image=name, variants=variants)
+
+    def exists(self, name):
+        return os.path.exists(os.path.join(self.media_root, name))
+
+    def test_shared_original_is_kept_until_last_row_is_deleted(self):
+        original = self.blob('property_images/aa/a.jpg')
+        card = self.blob('property_images/variants/cc/c.webp')
+        first, second = self.image(original, card), self.image(original, card)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(self.exists(original))
+        self.assertTrue(self.exists(card))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(self.exists(original))
+        self.assertFalse(self.exists(card))
+
+    def test_variant_shared_with_a_different_original_is_kept(self):
+        card = self.blob('property_images/variants/cc/c.webp')
+        first = self.image(self.blob('property_images/aa/a.jpg'), card)
+        self.image(self.blob('property_images/bb/b.jpg'), card)
+
+        first.delete()
+        self.assertEqual(
+            release_image_files(first.image.name, first.variants), ['property_images/aa/a.jpg']
+        )
+        self.assertTrue(self.exists(card))
+
+    def test_recently_touched_files_are_left_for_gc(self):
+        original = self.blob('property_images/aa/a.jpg', age=0)
+        row = self.image(original)
+        row.delete()
+        # An identical upload may have just refreshed the blob
+        self.assertEqual(release_image_files(original, {}), [])
+        self.assertTrue(self.exists(original))
+
+
+class SearchSnippetTests(TestCase):
+    def setUp(self):
+        Property.objects.create(
+            location='Lahore <img src=x>', address='<script>alert(1)</script> House', size='5 Marla',
+            bedrooms=3, bathrooms=2, actual_price=1000000,
+        )
+
+    def test_fts_snippet_escapes_property_text(self):
+        total, hits = SQLiteFTSSearchBackend().search('house', limit=10)
+        self.assertEqual(total, 1)
+        self.assertIn('&lt;script&gt;', hits[0]['snippet'])
+        self.assertIn('<b>House</b>', hits[0]['snippet'])
+        self.assertNotIn('<script>', hits[0]['snippet'])
+
+    def test_plain_snippet_escapes_property_text(self):
+        total, hits = DatabaseSearchBackend().search('house', limit=10)
+        self.assertEqual(total, 1)
+        self.assertEqual(hits[0]['snippet'], 'Lahore &lt;img src=x&gt;')
+
+
+class SetBidStatusesTests(TestCase):
+    def setUp(self):
+        self.bidder = CustomUser.objects.create_user(
+            username='Bidder', email='bidder@example.com', password='x')
+        self.property, self.other_property = [
+            Property.objects.create(
+                location='Lahore', address=f'House {i}', size='5 Marla',
+                bedrooms=3, bathrooms=2, actual_price=1000, date_listed=timezone.now().date(),
+            )
+            for i in range(2)
+        ]
+        self.bids = [
+            Bid.objects.create(property=self.property, bidder=self.bidder, amount=1000 + i)
+            for i in range(3)
+        ]
+        self.other_bid = Bid.objects.create(property=self.other_property, bidder=self.bidder, amount=1000)
+
+    def statuses(self):
+        return [bid.status for bid in Bid.objects.filter(property=self.property).order_by('id')]
+
+    def test_accepting_a_bid_rejects_the_rest(self):
+        result = bidding.set_bid_statuses([(self.bids[1].id, 'accept')])
+        self.assertEqual(result['accepted'], [self.bids[1].id])
+        self.assertEqual(result['properties_closed'], [self.property.id])
+        self.assertEqual(self.statuses(), ['rejected', 'accepted', 'rejected'])
+        self.property.refresh_from_db()
+        self.assertEqual(self.property.accepted_bid_id, self.bids[1].id)
+        # Other properties are untouched
+        self.other_bid.refresh_from_db()
+        self.assertEqual(self.other_bid.status, 'pending')
+
+    def test_two_accepts_on_one_property_are_refused(self):
+        result = bidding.set_bid_statuses([
+            (self.bids[0].id, 'accept'), (self.bids[1].id, 'accept'), (self.other_bid.id, 'accept'),
+        ])
+        self.assertEqual(result['accepted'], [self.other_bid.id])
+        self.assertEqual(
+            sorted(error['bid_id'] for error in result['errors']), [self.bids[0].id, self.bids[1].id])
+        self.assertEqual(self.statuses(), ['pending', 'pending', 'pending'])
+        self.property.refresh_from_db()
+        self.assertIsNone(self.property.accepted_bid_id)
+
+    def test_other_actions_on_a_property_with_a_winner_are_moot(self):
+        result = bidding.set_bid_statuses([
+            (self.bids[0].id, 'accept'), (self.bids[1].id, 'pending'), (self.bids[2].id, 'reject'),
+        ])
+        self.assertEqual(result['accepted'], [self.bids[0].id])
+        self.assertEqual((result['rejected'], result['pending']), (0, 0))
+        self.assertEqual(self.statuses(), ['accepted', 'rejected', 'rejected'])
+
+    def test_reject_or_pending_clears_accepted_bid(self):
+        for action in ('reject', 'pending'):
+            bidding.set_bid_statuses([(self.bids[0].id, 'accept')])
+            self.property.refresh_from_db()
+            self.assertEqual(self.property.accepted_bid_id, self.bids[0].id)
+
+            result = bidding.set_bid_statuses([(self.bids[0].id, action)])
+            self.assertEqual(result['errors'], [])
+            self.property.refresh_from_db()
+            self.assertIsNone(self.property.accepted_bid_id)
+            self.assertEqual(self.statuses()[0], bidding.BID_ACTIONS[action])
+
+
+class CloseDueAuctionsTests(TestCase):
+    def setUp(self):
+        self.bidder = CustomUser.objects.create_user(
+            username='Bidder', email='bidder@example.com', password='x')
+        listed = (timezone.now() - timedelta(days=5)).date()
+        self.properties = [
+            Property.objects.create(
+                location='Lahore', address=f'House {i}', size='5 Marla',
+                bedrooms=3, bathrooms=2, actual_price=1000, date_listed=listed,
+            )
+            for i in range(3)
+        ]
+
+    def bid(self, property_obj, amount, status='pending'):
+        return Bid.objects.create(property=property_obj, bidder=self.bidder, amount=amount, status=status)
+
+    def test_highest_bid_wins_and_the_rest_are_rejected(self):
+        low, high = self.bid(self.properties[0], 1000), self.bid(self.properties[0], 1500)
+        self.assertEqual(bidding.close_due_auctions(), 3)
+
+        low.refresh_from_db()
+        high.refresh_from_db()
+        self.assertEqual((low.status, high.status), ('rejected', 'accepted'))
+        self.properties[0].refresh_from_db()
+        self.assertEqual(self.properties[0].accepted_bid_id, high.id)
+
+    def test_existing_accepted_bid_wins(self):
+        accepted = self.bid(self.properties[0], 1000, status='accepted')
+        higher = self.bid(self.properties[0], 2000)
+        Property.objects.filter(id=self.properties[0].id).update(accepted_bid=accepted)
+
+        bidding.close_due_auctions()
+        accepted.refresh_from_db()
+        higher.refresh_from_db()
+        self.assertEqual((accepted.status, higher.status), ('accepted', 'rejected'))
+        self.properties[0].refresh_from_db()
+        self.assertEqual(self.properties[0].accepted_bid_id, accepted.id)
+
+    def test_rejected_bid_never_wins(self):
+        valid = self.bid(self.properties[0], 100)
+        rejected = self.bid(self.properties[0], 500, status='rejected')
+
+        bidding.close_due_auctions()
+        valid.refresh_from_db()
+        rejected.refresh_from_db()
+        self.assertEqual((valid.status, rejected.status), ('accepted', 'rejected'))
+        self.properties[0].refresh_from_db()
+        self.assertEqual(self.properties[0].accepted_bid_id, valid.id)
+
+    def test_every_batch_is_closed(self):
+        for property_obj in self.properties:
+            self.bid(property_obj, 1000)
+        open_property = Property.objects.create(
+            location='Lahore', address='Open House', size='5 Marla',
+            bedrooms=3, bathrooms=2, actual_price=1000, date_listed=timezone.now().date(),
+        )
+
+        self.assertEqual(bidding.close_due_auctions(batch_size=2), 3)
+        for property_obj in self.properties:
+            property_obj.refresh_from_db()
+            self.assertIsNotNone(property_obj.auction_closed_at)
+            self.assertIsNotNone(property_obj.accepted_bid_id)
+        open_property.refresh_from_db()
+        self.assertIsNone(open_property.auction_closed_at)
+        # Closed auctions are not picked up again
+        self.assertEqual(bidding.close_due_auctions(batch_size=2), 0)
+
+
+class BidStatsTests(TestCase):
+    def test_deleting_a_bidder_refreshes_the_auction_summary(self):
+        property_obj = Property.objects.create(
+            location='Lahore', address='House 1', size='5 Marla',
+            bedrooms=3, bathrooms=2, actual_price=1000, date_listed=timezone.now().date(),
+        )
+        first, second = [
+            CustomUser.objects.create_user(username=f'Bidder {i}', email=f'bidder{i}@example.com', password='x')
+            for i in range(2)
+        ]
+        bidding.place_bid(property_obj.id, first, 1000)
+        bidding.place_bid(property_obj.id, second, 1500)
+
+        second.delete()
+        property_obj.refresh_from_db()
+        self.assertEqual((property_obj.bid_count, property_obj.highest_bid_amount), (1, Decimal('1000')))
+        # A bid above the remaining one is accepted again
+        bidding.place_bid(property_obj.id, first, 1200)
+
+        first.delete()
+        property_obj.refresh_from_db()
+        self.assertEqual((property_obj.bid_count, property_obj.highest_bid_amount), (0, None))
+
+
+class MarkBidsNotifiedTests(TestCase):
+    def setUp(self):
+        property_obj = Property.objects.create(
+            location='Lahore', address='House 1', size='5 Marla',
+            bedrooms=3, bathrooms=2, actual_price=1000, date_listed=timezone.now().date(),
+        )
+        self.owner, other = [
+            CustomUser.objects.create_user(username=f'Bidder {i}', email=f'bidder{i}@example.com', password='x')
+            for i in range(2)
+        ]
+        self.own_bid = Bid.objects.create(property=property_obj, bidder=self.owner, amount=1000)
+        self.other_bid = Bid.objects.create(property=property_obj, bidder=other, amount=1100)
+        self.client = APIClient()
+
+    def post(self):
+        return self.client.post(
+            reverse('bulk-mark-bids-notified'), {'bid_ids': [self.own_bid.id, self.other_bid.id]}, format='json')
+
+    def test_requires_login(self):
+        self.assertEqual(self.post().status_code, 401)
+        self.assertFalse(Bid.objects.filter(notified=True).exists())
+
+    def test_only_marks_the_callers_bids(self):
+        token = Token.objects.create(user=self.owner)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        response = self.post()
+        self.assertEqual(response.data['updated'], 1)
+        self.own_bid.refresh_from_db()
+        self.other_bid.refresh_from_db()
+        self.assertEqual((self.own_bid.notified, self.other_bid.notified), (True, False))
+
+
+@override_settings(JOB_RETRY_DELAY=10, JOB_LEASE_TIMEOUT=600)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.calls = []
+
+        def succeed(**payload):
+            self.calls.append(payload)
+            return {'ok': True}
+
+        def fail(**payload):
+            raise RuntimeError('boom')
+
+        patcher = mock.patch.dict(jobs.TASKS, {'test.succeed': succeed, 'test.fail': fail})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def claim_and_run(self):
+        job = jobs.claim_next_job('worker-1')
+        self.assertIsNotNone(job)
+        return job, jobs.run_job(job)
+
+    def test_claim_takes_due_jobs_once(self):
+        jobs.enqueue('test.succeed', delay=60)
+        due = jobs.enqueue('test.succeed', {'x': 1})
+
+        job = jobs.claim_next_job('worker-1')
+        self.assertEqual(job.id, due.id)
+        self.assertEqual((job.status, job.locked_by, job.attempts), (Job.RUNNING, 'worker-1', 1))
+        # The other job isn't due yet and the claimed one can't be taken again
+        self.assertIsNone(jobs.claim_next_job('worker-2'))
+
+    def test_success(self):
+        jobs.enqueue('test.succeed', {'x': 1})
+        job, succeeded = self.claim_and_run()
+        self.assertTrue(succeeded)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result, job.locked_by), (Job.SUCCEEDED, {'ok': True}, ''))
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(self.calls, [{'x': 1}])
+
+    def test_retries_with_backoff_then_fails(self):
+        jobs.enqueue('test.fail', max_attempts=2)
+        before = timezone.now()
+        job, succeeded = self.claim_and_run()
+        self.assertFalse(succeeded)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertEqual(job.last_error, 'RuntimeError: boom')
+        self.assertGreaterEqual(job.run_at, before + timedelta(seconds=10))
+        self.assertIsNone(jobs.claim_next_job('worker-1'))
+
+        Job.objects.filter(id=job.id).update(run_at=timezone.now())
+        job, succeeded = self.claim_and_run()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(jobs.retry_delay(3), timedelta(seconds=40))
+
+    def test_unknown_task_fails_without_retry(self):
+        jobs.enqueue('test.missing', max_attempts=3)
+        job, succeeded = self.claim_and_run()
+        self.assertFalse(succeeded)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 1))
+        self.assertIn('Unknown task', job.last_error)
+
+    def test_stale_jobs_are_requeued_or_failed(self):
+        for max_attempts in (3, 1):
+            jobs.enqueue('test.succeed', max_attempts=max_attempts)
+            jobs.claim_next_job('crashed')
+        fresh = jobs.enqueue('test.succeed')
+        jobs.claim_next_job('alive')
+        Job.objects.exclude(id=fresh.id).update(locked_at=timezone.now() - timedelta(seconds=601))
+
+        self.assertEqual(jobs.requeue_stale_jobs(), (1, 1))
+        statuses = dict(Job.objects.values_list('max_attempts', 'status').exclude(id=fresh.id))
+        self.assertEqual(statuses, {3: Job.QUEUED, 1: Job.FAILED})
+        fresh.refresh_from_db()
+        self.assertEqual((fresh.status, fresh.locked_by), (Job.RUNNING, 'alive'))
+
+
+class TokenCacheInvalidationTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        self.user = CustomUser.objects.create_user(
+            username='Member', email='member@example.com', password='x')
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def authenticate(self):
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        return CachedTokenAuthentication().authenticate(request)
+
+    def test_logout_evicts_the_cached_token(self):
+        self.assertEqual(self.client.get(reverse('user-bids')).status_code, 200)
+        self.assertIsNotNone(token_cache.get(self.token.key))
+
+        self.assertEqual(self.client.post(reverse('logout')).status_code, 200)
+        self.assertEqual(self.client.get(reverse('user-bids')).status_code, 401)
+
+    def test_deleted_user_stops_authenticating(self):
+        self.assertEqual(self.client.get(reverse('user-bids')).status_code, 200)
+
+        response = APIClient().delete(reverse('user-delete', args=[self.user.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(reverse('user-bids')).status_code, 401)
+
+    def test_role_toggle_is_seen_by_cached_token(self):
+        user, _ = self.authenticate()
+        self.assertFalse(user.is_staff)
+
+        response = APIClient().post(reverse('user-toggle-role', args=[self.user.id]))
+        self.assertTrue(response.data['is_staff'])
+        user, _ = self.authenticate()
+        self.assertTrue(user.is_staff)
+
+
+@override_settings(
+    LOGIN_FAILURES_PER_EMAIL=2, LOGIN_EMAIL_WINDOW=900,
+    LOGIN_ATTEMPTS_PER_IP=4, LOGIN_IP_WINDOW=60,
+    PASSWORD_PBKDF2_ITERATIONS=1000,
+)
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        CustomUser.objects.create_user(username='Member', email='member@example.com', password='secret')
+
+    def login(self, password, ip='203.0.113.1', email='member@example.com'):
+        return self.client.post(
+            reverse('login'), {'email': email, 'password': password},
+            REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=ip,
+        )
+
+    def test_email_is_locked_after_repeated_failures(self):
+        self.assertEqual(self.login('wrong').status_code, 400)
+        self.assertEqual(self.login('wrong').status_code, 400)
+        # Locked even with the right password, until the window ends
+        response = self.login('secret')
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(0 < int(response['Retry-After']) <= 900)
+
+    def test_successful_login_resets_failures(self):
+        self.assertEqual(self.login('wrong').status_code, 400)
+        self.assertEqual(self.login('secret').status_code, 200)
+        self.assertEqual(self.login('wrong').status_code, 400)
+        self.assertEqual(self.login('secret').status_code, 200)
+
+    def test_attempts_are_limited_per_client_ip(self):
+        for i in range(4):
+            self.assertEqual(self.login('wrong', email=f'user{i}@example.com').status_code, 400)
+        response = self.login('secret')
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(0 < int(response['Retry-After']) <= 60)
+        # Another client behind the same proxy is unaffected
+        self.assertEqual(self.login('secret', ip='203.0.113.2').status_code, 200)
+
+    def test_client_ip(self):
+        factory = RequestFactory()
+        request = factory.get('/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='1.1.1.1, 2.2.2.2, 3.3.3.3')
+        with override_settings(TRUSTED_PROXY_COUNT=0):
+            self.assertEqual(client_ip(request), '10.0.0.1')
+        with override_settings(TRUSTED_PROXY_COUNT=1):
+            self.assertEqual(client_ip(request), '3.3.3.3')
+        with override_settings(TRUSTED_PROXY_COUNT=2):
+            self.assertEqual(client_ip(request), '2.2.2.2')
+        with override_settings(TRUSTED_PROXY_COUNT=5):
+            # Fewer hops than proxies: the leftmost address is the best guess
+            self.assertEqual(client_ip(request), '1.1.1.1')
+        with override_settings(TRUSTED_PROXY_COUNT=1):
+            self.assertEqual(client_ip(factory.get('/', REMOTE_ADDR='10.0.0.1')), '10.0.0.1')
@@ -0,0 +1,86 @@
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+# Fixed-window counters kept in the Django cache (LOGIN_RATE_CACHE, the
+# database cache by default) rather than process memory, so all workers
+# sharing that store enforce one limit and restarts don't reset it. Where
+# instances don't share a database, point the cache at Redis or memcached.
+IP_PREFIX = 'login:ip:'
+EMAIL_PREFIX = 'login:email:'
+
+
+def _cache():
+    return caches[getattr(settings, 'LOGIN_RATE_CACHE', 'default')]
+
+
+def client_ip(request):
+    """The client address, taking TRUSTED_PROXY_COUNT proxies into account.
+
+    Behind N trusted proxies the client is the Nth address from the right
+    of X-Forwarded-For; addresses further left are client-supplied and
+    can't be trusted. Without proxies (or the header) it is REMOTE_ADDR.
+    """
+    proxies = getattr(settings, 'TRUSTED_PROXY_COUNT', 0)
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if proxies and forwarded:
+        addresses = [address.strip() for address in forwarded.split(',') if address.strip()]
+        if addresses:
+            return addresses[-min(proxies, len(addresses))]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _window(entry, now):
+    """(count, seconds left) of a stored window, or (0, 0) once it has ended."""
+    if entry is None or entry[1] <= now:
+        return 0, 0
+    return entry[0], entry[1] - now
+
+
+async def _count(key, window):
+    """Count one more event in ``key``'s window; returns (count, seconds left).
+
+    The window end is stored next to the count because cache backends
+    don't agree on whether incr() keeps a key's timeout. The read-modify-
+    write isn't atomic, so concurrent requests may undercount slightly.
+    """
+    cache = _cache()
+    now = time.time()
+    count, remaining = _window(await cache.aget(key), now)
+    if not remaining:
+        remaining = window
+    count += 1
+    await cache.aset(key, (count, now + remaining), timeout=math.ceil(remaining))
+    return count, remaining
+
+
+async def acheck_login_rate(ip, email):
+    """Return the seconds to wait before retrying, or None if the attempt may proceed.
+
+    Every attempt counts against the client IP; only failed attempts count
+    against the email, so a user who mistypes once isn't locked out by
+    someone else sharing their network.
+    """
+    ip_limit = getattr(settings, 'LOGIN_ATTEMPTS_PER_IP', 30)
+    email_limit = getattr(settings, 'LOGIN_FAILURES_PER_EMAIL', 5)
+    ip_window = getattr(settings, 'LOGIN_IP_WINDOW', 60)
+    if email_limit:
+        failures, remaining = _window(await _cache().aget(EMAIL_PREFIX + email), time.time())
+        if failures >= email_limit:
+            return math.ceil(remaining)
+    if ip_limit:
+        attempts, remaining = await _count(IP_PREFIX + ip, ip_window)
+        if attempts > ip_limit:
+            return math.ceil(remaining)
+    return None
+
+
+async def arecord_login_failure(email):
+    await _count(EMAIL_PREFIX + email, getattr(settings, 'LOGIN_EMAIL_WINDOW', 900))
+
+
+async def areset_login_failures(email):
+    await _cache().adelete(EMAIL_PREFIX + email)
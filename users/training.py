@@ -0,0 +1,122 @@
+import json
+import os
+import secrets
+from datetime import datetime, timezone as dt_timezone
+
+import joblib
+import numpy as np
+
+from .models import Property
+from .prediction import (FEATURE_COLUMNS, ForestPriceEvaluator, ModelRegistry, build_evaluator,
+                         encode_features, location_category, model_dir)
+
+
+def iter_training_chunks(chunk_size=2000, test_every=5, unmapped=None):
+    """Stream ``(X_train, y_train, X_test, y_test)`` blocks from the Property table.
+
+    Rows are read with ``iterator()`` so only one chunk is ever materialized.
+    Every ``test_every``-th property (by id) is held out for evaluation,
+    which keeps the split stable across passes without shuffling. Pass a
+    Counter as ``unmapped`` to count locations that match no model category
+    (those rows get all-zero location columns).
+    """
+    rows = (
+        Property.objects
+        .filter(area_sqft__isnull=False, actual_price__gt=0)
+        .order_by('id')
+        .values_list('id', 'area_sqft', 'bedrooms', 'location', 'actual_price')
+        .iterator(chunk_size=chunk_size)
+    )
+
+    block = []
+    for row in rows:
+        block.append(row)
+        if len(block) >= chunk_size:
+            yield _encode_block(block, test_every, unmapped)
+            block = []
+    if block:
+        yield _encode_block(block, test_every, unmapped)
+
+
+def _encode_block(block, test_every, unmapped=None):
+    train_x, train_y, test_x, test_y = [], [], [], []
+    for prop_id, area, bedrooms, location, price in block:
+        if unmapped is not None and location_category(location) is None:
+            unmapped[location] += 1
+        try:
+            features = encode_features({'size': area, 'bedrooms': bedrooms, 'location': location})
+        except ValueError:
+            continue
+        if test_every and prop_id % test_every == 0:
+            test_x.append(features)
+            test_y.append(price)
+        else:
+            train_x.append(features)
+            train_y.append(price)
+
+    width = len(FEATURE_COLUMNS)
+    return (
+        np.array(train_x, dtype=float).reshape(-1, width),
+        np.array(train_y, dtype=float),
+        np.array(test_x, dtype=float).reshape(-1, width),
+        np.array(test_y, dtype=float),
+    )
+
+
+def regression_metrics(y_true, y_pred):
+    if not len(y_true):
+        return {}
+    errors = y_pred - y_true
+    total = ((y_true - y_true.mean()) ** 2).sum()
+    return {
+        'mae': float(np.abs(errors).mean()),
+        'rmse': float(np.sqrt((errors ** 2).mean())),
+        'r2': float(1 - (errors ** 2).sum() / total) if total else None,
+    }
+
+
+def save_artifacts(model, scaler, metrics, activate=False, compress=0):
+    """Write a versioned model/scaler pair plus metrics; optionally make it live.
+
+    Tree ensembles are additionally exported as flat ``.npy`` node arrays in
+    ``model_arrays/``; the model registry memory-maps those instead of
+    unpickling the forest, so ``compress`` only affects the pickle's size on
+    disk. Compressed pickles of other models are loaded without mmap.
+    """
+    # Sortable by time; the suffix keeps concurrent runs apart, and makedirs
+    # refuses an existing directory because a live version must never change
+    version = '{}-{}'.format(
+        datetime.now(dt_timezone.utc).strftime('%Y%m%d%H%M%S%f'), secrets.token_hex(3))
+    version_dir = os.path.join(model_dir(), 'versions', version)
+    os.makedirs(version_dir)
+
+    model_path = os.path.join(version_dir, 'model.pkl')
+    scaler_path = os.path.join(version_dir, 'scaler.pkl')
+    joblib.dump(model, model_path, compress=compress)
+    joblib.dump(scaler, scaler_path)
+
+    arrays_path = os.path.join(version_dir, 'model_arrays')
+    evaluator = build_evaluator(model, scaler)
+    if isinstance(evaluator, ForestPriceEvaluator):
+        evaluator.save(arrays_path, source_digest=ModelRegistry._sha256(model_path))
+    with open(os.path.join(version_dir, 'metrics.json'), 'w') as f:
+        json.dump(dict(metrics, version=version, features=FEATURE_COLUMNS), f, indent=2)
+
+    if activate:
+        activate_version(version)
+
+    return version, version_dir
+
+
+def activate_version(version):
+    """Make ``versions/<version>`` the live model by swapping the ``CURRENT`` pointer.
+
+    The version directory already holds model, scaler and exported arrays,
+    so replacing the one pointer file switches all three at once.
+    """
+    if not os.path.isfile(os.path.join(model_dir(), 'versions', version, 'model.pkl')):
+        raise FileNotFoundError(f'No saved model version {version!r}')
+    pointer = os.path.join(model_dir(), ModelRegistry.POINTER)
+    with open(pointer + '.tmp', 'w') as f:
+        f.write(version + '\n')
+    os.replace(pointer + '.tmp', pointer)
@@ -1,14 +1,17 @@
 from django.urls import path
-from .views import (SignupView, LoginView, UserListView, PropertyCreateView,
+from .views import (SignupView, LoginView, LogoutView, UserListView, PropertyCreateView,
                    PropertyDeleteView, PropertyDetailView, PropertyUpdateView, 
+                   PropertyImagesView, PropertyImageDetailView, JobStatusView,
                    PlaceBidView, PropertyBidsView, BidActionView, AllBidsView,
                    UserBidsView, MarkBidNotifiedView, UserStatsView,
-                   UserRoleToggleView, UserDeleteView)
+                   UserRoleToggleView, UserDeleteView, property_bid_stream,
+                   BulkBidActionView, BulkMarkBidsNotifiedView, NotificationInboxView)
 
 urlpatterns = [
     # Authentication URLs
     path('signup/', SignupView.as_view(), name='signup'),
     path('login/', LoginView.as_view(), name='login'),
+    path('logout/', LogoutView.as_view(), name='logout'),
     path('users/', UserListView.as_view(), name='user-list'),
     
     # Property URLs
@@ -16,14 +19,21 @@ urlpatterns = [
     path('property/<int:id>/', PropertyDetailView.as_view(), name='property-detail'),
     path('property/update/<int:id>/', PropertyUpdateView.as_view(), name='property-update'),
     path('property/delete/<int:id>/', PropertyDeleteView.as_view(), name='delete-property'),
+    path('property/<int:id>/images/', PropertyImagesView.as_view(), name='property-images'),
+    path('property/<int:id>/images/<int:image_id>/', PropertyImageDetailView.as_view(), name='property-image-detail'),
     
     # Bidding URLs
     path('bids/', PlaceBidView.as_view(), name='place-bid'),
     path('property/<int:property_id>/bids/', PropertyBidsView.as_view(), name='property-bids'),
+    path('property/<int:property_id>/bids/stream/', property_bid_stream, name='property-bid-stream'),
     path('bids/all/', AllBidsView.as_view(), name='all-bids'),
-    path('bids/<int:bid_id>/<str:action>/', BidActionView.as_view(), name='bid-action'),
-    path('bids/user/<str:email>/', UserBidsView.as_view(), name='user-bids'),
+    path('bids/bulk-action/', BulkBidActionView.as_view(), name='bulk-bid-action'),
+    path('bids/mark-notified/', BulkMarkBidsNotifiedView.as_view(), name='bulk-mark-bids-notified'),
     path('bids/<int:bid_id>/mark-notified/', MarkBidNotifiedView.as_view(), name='mark-bid-notified'),
+    path('bids/<int:bid_id>/<str:action>/', BidActionView.as_view(), name='bid-action'),
+    path('bids/user/', UserBidsView.as_view(), name='user-bids'),
+    path('notifications/', NotificationInboxView.as_view(), name='notification-inbox'),
+    path('jobs/<int:job_id>/', JobStatusView.as_view(), name='job-status'),
     path('users/stats/', UserStatsView.as_view(), name='user-stats'),
     path('users/<int:user_id>/toggle-role/', UserRoleToggleView.as_view(), name='user-toggle-role'),
     path('users/<int:user_id>/delete/', UserDeleteView.as_view(), name='user-delete'),
@@ -0,0 +1,52 @@
+import re
+
+
+# Square feet per unit. Marla/kanal follow the revenue-department standard
+# of 272.25 sq ft per marla used on most listing sites.
+AREA_UNITS = {
+    'sqft': 1.0,
+    'sq ft': 1.0,
+    'sq. ft': 1.0,
+    'sq.ft': 1.0,
+    'square feet': 1.0,
+    'square foot': 1.0,
+    'ft2': 1.0,
+    'sqyd': 9.0,
+    'sq yd': 9.0,
+    'sq yards': 9.0,
+    'square yards': 9.0,
+    'gaz': 9.0,
+    'sqm': 10.7639,
+    'sq m': 10.7639,
+    'm2': 10.7639,
+    'square meters': 10.7639,
+    'marla': 272.25,
+    'marlas': 272.25,
+    'kanal': 5445.0,
+    'kanals': 5445.0,
+}
+
+_AREA_RE = re.compile(r'^\s*([0-9]+(?:\.[0-9]+)?)\s*(.*?)\s*\.?\s*$')
+
+
+def parse_area_sqft(value):
+    """Convert a free-text size such as "5 Marla" or "1200 sq ft" to square feet.
+
+    Bare numbers are taken to already be in square feet. Returns None when the
+    value cannot be understood.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    match = _AREA_RE.match(str(value).replace(',', '').lower())
+    if not match:
+        return None
+    amount, unit = match.groups()
+    if not unit:
+        return float(amount)
+    factor = AREA_UNITS.get(unit)
+    if factor is None:
+        return None
+    return round(float(amount) * factor, 2)
@@ -3,31 +3,39 @@ from rest_framework.response import Response
 from rest_framework import status, generics, viewsets
 from rest_framework.authtoken.models import Token
 from rest_framework.permissions import IsAuthenticated
-from .serializers import UserSerializer, LoginSerializer, PropertySerializer, BidSerializer
-from .models import CustomUser, Property, PropertyImage, Bid
-from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.exceptions import AuthenticationFailed
+from asgiref.sync import sync_to_async
+from .serializers import (UserSerializer, LoginSerializer, PropertySerializer, PropertyImageSerializer,
+                          BidSerializer, JobSerializer)
+from .models import Property, Bid, Job
+from .filters import filter_bids_since, filter_properties, FilterError
+from .pagination import (BidCursorPagination, HotPropertyPagination, PropertyCursorPagination,
+                         SearchPagination)
+from .search import get_search_backend
+from .images import ImageError, add_images, remove_images, reorder_images
+from .tasks import queue_image_processing
+from . import bidding
+from .authentication import CachedTokenAuthentication, acheck_credentials
+from .throttling import acheck_login_rate, areset_login_failures, arecord_login_failure, client_ip
+from .events import KEEPALIVE_INTERVAL, format_sse, get_broker, property_channel, user_channel
+from .prediction import (MAX_BATCH_SIZE, ModelNotAvailable, build_feature_matrix, encode_features,
+                         predict_one, predict_rows, prediction_cache, price_model_registry,
+                         read_csv_records)
+from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 from rest_framework.generics import DestroyAPIView
 from rest_framework.decorators import api_view, permission_classes
-from django.http import HttpResponse
-import joblib
-import pandas as pd
-import os
-from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from django.core.handlers.asgi import ASGIRequest
+import csv
+import json
+from django.db import transaction
 from django.shortcuts import get_object_or_404
-import numpy as np
-from decimal import Decimal, InvalidOperation
 from datetime import datetime
 from django.contrib.auth import get_user_model
 
-try:
-    import pandas as pd
-    import joblib
-    import numpy as np
-except ImportError:
-    pd = None
-    joblib = None
-    np = None
-
 def hello_world(request):
     return HttpResponse("Hello, World!")
 
@@ -59,24 +67,67 @@ class SignupView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-class LoginView(APIView):
+@method_decorator(csrf_exempt, name='dispatch')
+class LoginView(View):
+    """Token login as an async view.
+
+    Under ASGI the worker keeps serving other requests while the password
+    hash is checked on the login pool; under WSGI it behaves like a regular
+    synchronous view.
+    """
+
+    async def post(self, request):
+        if request.content_type == 'application/json':
+            try:
+                data = json.loads(request.body or b'{}')
+            except ValueError:
+                return JsonResponse({'error': 'Invalid JSON body'}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            data = request.POST
+
+        serializer = LoginSerializer(data=data)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        email = serializer.validated_data['email'].lower()
+        password = serializer.validated_data['password']
+
+        retry_after = await acheck_login_rate(client_ip(request), email)
+        if retry_after is not None:
+            response = JsonResponse(
+                {'error': 'Too many login attempts. Please try again later.'},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+            )
+            response['Retry-After'] = str(retry_after)
+            return response
+
+        user = await acheck_credentials(serializer.validated_data['email'], password)
+        if user is None:
+            await arecord_login_failure(email)
+            return JsonResponse(
+                {'non_field_errors': ['Invalid email or password']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        await areset_login_failures(email)
+
+        token, created = await Token.objects.aget_or_create(user=user)
+        return JsonResponse({
+            'token': token.key,
+            'user': {
+                'id': user.id,
+                'username': user.username,
+                'email': user.email,
+                'is_staff': user.is_staff
+            }
+        }, status=status.HTTP_200_OK)
+
+class LogoutView(APIView):
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
     def post(self, request):
-        serializer = LoginSerializer(data=request.data)
-        if serializer.is_valid():
-            user = serializer.validated_data
-            token, created = Token.objects.get_or_create(user=user)
-            
-            return Response({
-                'token': token.key,
-                'user': {
-                    'id': user.id,
-                    'username': user.username,
-                    'email': user.email,
-                    'is_staff': user.is_staff
-                }
-            }, status=status.HTTP_200_OK)
-            
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        # Deleting the token also evicts it from the auth cache (users.signals)
+        request.auth.delete()
+        return Response({'message': 'Logged out successfully'})
 
 class UserListView(APIView):
     def get(self, request):
@@ -102,31 +153,63 @@ class PropertyCreateView(APIView):
             data.pop('predicted_price')  # Remove predicted_price from the data
         images = request.FILES.getlist('images')  # Get multiple images
 
-        property_instance = Property.objects.create(
-            location=data.get("location"),
-            address=data.get("address"),
-            size=data.get("size"),
-            bedrooms=data.get("bedrooms"),
-            bathrooms=data.get("bathrooms"),
-            actual_price=data.get("actual_price"),
-            owner_name=data.get("owner_name"),
-            date_listed=data.get("date_listed"),
-            description=data.get("description"),
-        )
-
-        for image in images:
-            PropertyImage.objects.create(property=property_instance, image=image)
+        # The row, its image rows and the processing job commit together;
+        # variants are generated by a worker (manage.py run_jobs)
+        with transaction.atomic():
+            property_instance = Property.objects.create(
+                location=data.get("location"),
+                address=data.get("address"),
+                size=data.get("size"),
+                bedrooms=data.get("bedrooms"),
+                bathrooms=data.get("bathrooms"),
+                actual_price=data.get("actual_price"),
+                owner_name=data.get("owner_name"),
+                date_listed=data.get("date_listed"),
+                description=data.get("description"),
+            )
+            job = queue_image_processing(add_images(property_instance, images))
 
-        return Response({"message": "Property created successfully"}, status=201)
+        return Response({
+            "message": "Property created successfully",
+            "id": property_instance.id,
+            "job_id": job.id if job else None,
+        }, status=201)
 
     
 
 
 @api_view(['GET'])
 def get_properties(request):
-        properties = Property.objects.all()
-        serializer = PropertySerializer(properties, many=True)
-        return Response(serializer.data)
+        try:
+            properties = filter_properties(Property.objects.with_related(), request.query_params)
+        except FilterError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.query_params.get('sort') == 'hot':
+            # Most-bid auctions first, served from the bid_count index
+            paginator = HotPropertyPagination()
+            properties = properties.order_by(*paginator.ordering)
+        else:
+            paginator = PropertyCursorPagination()
+        page = paginator.paginate_queryset(properties, request)
+        serializer = PropertySerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
+@api_view(['GET'])
+def search_properties(request):
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'error': "Query parameter 'q' is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+    paginator = SearchPagination()
+    try:
+        limit, offset = paginator.get_limit_offset(request)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    total, hits = get_search_backend().search(query, limit, offset)
+    return Response(paginator.get_paginated_data(request, total, hits, limit, offset))
 
 # class PropertyAPIView(APIView):
 
@@ -151,7 +234,7 @@ def get_properties(request):
 
 
 class PropertyDetailView(generics.RetrieveAPIView):
-    queryset = Property.objects.all()
+    queryset = Property.objects.with_related()
     serializer_class = PropertySerializer
     lookup_field = 'id' 
        
@@ -187,25 +270,31 @@ class PropertyUpdateView(APIView):
                         status=status.HTTP_400_BAD_REQUEST
                     )
             
-            property_instance.save()
-
-            # Handle images
-            new_images = request.FILES.getlist('images')
-            if new_images:
-                # Delete existing images
-                PropertyImage.objects.filter(property=property_instance).delete()
-                
-                # Add new images
-                for image in new_images:
-                    PropertyImage.objects.create(
-                        property=property_instance,
-                        image=image
-                    )
+            # Images are edited as a diff: `remove_images` ids are deleted,
+            # `images` uploads are appended and `image_order` ids move first
+            try:
+                remove_ids = _parse_image_ids(request.data, 'remove_images')
+                order_ids = _parse_image_ids(request.data, 'image_order')
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+            try:
+                with transaction.atomic():
+                    property_instance.save()
+                    if remove_ids:
+                        remove_images(property_instance, remove_ids)
+                    job = queue_image_processing(add_images(property_instance, request.FILES.getlist('images')))
+                    if order_ids:
+                        reorder_images(property_instance, order_ids)
+            except ImageError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+            property_instance = Property.objects.with_related().get(id=property_instance.id)
             serializer = PropertySerializer(property_instance)
             return Response({
                 'message': 'Property updated successfully',
-                'property': serializer.data
+                'property': serializer.data,
+                'job_id': job.id if job else None,
             }, status=status.HTTP_200_OK)
 
         except Property.DoesNotExist:
@@ -223,6 +312,89 @@ class PropertyUpdateView(APIView):
 
 
 
+def _parse_image_ids(data, key):
+    """Image ids from a JSON list or repeated / comma-separated form fields."""
+    values = data.getlist(key) if hasattr(data, 'getlist') else data.get(key, [])
+    if isinstance(values, (str, int)):
+        values = [values]
+    if not isinstance(values, list):
+        raise ValueError(f"'{key}' must be a list of image ids")
+    try:
+        return [int(part) for value in values for part in str(value).split(',') if part.strip()]
+    except ValueError:
+        raise ValueError(f"'{key}' must contain image ids")
+
+
+class PropertyImagesView(APIView):
+    """Edit a property's gallery one image at a time.
+
+    GET lists the images in order, POST appends the `images` uploads,
+    PATCH reorders by `order` (image ids) and DELETE removes `ids`.
+    """
+    parser_classes = (JSONParser, MultiPartParser, FormParser)
+
+    def _gallery_response(self, property_instance, status_code=status.HTTP_200_OK):
+        images = property_instance.images.all()
+        return Response(PropertyImageSerializer(images, many=True).data, status=status_code)
+
+    def get(self, request, id):
+        property_instance = get_object_or_404(Property, id=id)
+        return self._gallery_response(property_instance)
+
+    def post(self, request, id):
+        property_instance = get_object_or_404(Property, id=id)
+        uploads = request.FILES.getlist('images')
+        if not uploads:
+            return Response({'error': 'No images uploaded'}, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            added = add_images(property_instance, uploads)
+            job = queue_image_processing(added)
+        return Response({
+            'images': PropertyImageSerializer(added, many=True).data,
+            'job_id': job.id,
+        }, status=status.HTTP_201_CREATED)
+
+    def patch(self, request, id):
+        property_instance = get_object_or_404(Property, id=id)
+        try:
+            order_ids = _parse_image_ids(request.data, 'order')
+            if not order_ids:
+                raise ValueError("'order' must be a non-empty list of image ids")
+            reorder_images(property_instance, order_ids)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return self._gallery_response(property_instance)
+
+    def delete(self, request, id):
+        property_instance = get_object_or_404(Property, id=id)
+        try:
+            image_ids = _parse_image_ids(request.data, 'ids') or _parse_image_ids(request.query_params, 'ids')
+            if not image_ids:
+                raise ValueError("'ids' must be a non-empty list of image ids")
+            with transaction.atomic():
+                remove_images(property_instance, image_ids)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return self._gallery_response(property_instance)
+
+
+class PropertyImageDetailView(APIView):
+    def delete(self, request, id, image_id):
+        property_instance = get_object_or_404(Property, id=id)
+        try:
+            with transaction.atomic():
+                remove_images(property_instance, [image_id])
+        except ImageError:
+            return Response({'error': 'Image not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class JobStatusView(generics.RetrieveAPIView):
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    lookup_url_kwarg = 'job_id'
+
+
 class PropertyDeleteView(DestroyAPIView):
     queryset = Property.objects.all()
     serializer_class = PropertySerializer
@@ -233,234 +405,205 @@ class PropertyDeleteView(DestroyAPIView):
 
 
 class PricePredictionView(APIView):
-    def __init__(self):
-        # Define paths relative to Django project
-        model_path = os.path.join(settings.BASE_DIR, 'ml_models', 'model.pkl')
-        scaler_path = os.path.join(settings.BASE_DIR, 'ml_models', 'scaler.pkl')
-        
-        # Load the models
-        try:
-            self.model = joblib.load(model_path)
-            self.scaler = joblib.load(scaler_path)
-        except FileNotFoundError as e:
-            print(f"Error loading models: {e}")
-            raise Exception("ML models not found. Please ensure model.pkl and scaler.pkl are in the ml_models directory.")
-
     def post(self, request):
         try:
-            if pd is None or joblib is None or np is None:
-                return Response({
-                    'error': 'Required libraries not available'
-                }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
-                
+            loaded = price_model_registry.get()
+
             # Extract features from request
-            size = float(request.data.get('size'))
-            bedrooms = int(request.data.get('bedrooms'))
-            location = request.data.get('location', '').lower()
-
-            # Create location encoding
-            locations = ['urban', 'suburban', 'rural']
-            location_features = {f'location_{loc}': 1 if loc == location else 0 
-                               for loc in locations}
-            
-            # Create feature dataframe
-            features = pd.DataFrame({
-                'size': [size],
-                'bedrooms': [bedrooms],
-                **location_features
-            })
-            
-            # Make prediction
-            scaled_features = self.scaler.transform(features)
-            prediction = self.model.predict(scaled_features)[0]
+            features = encode_features(request.data)
+
+            # Make prediction, reusing results for repeated feature combinations
+            cache_key = prediction_cache.make_key(loaded.version, features)
+            prediction = prediction_cache.get(cache_key)
+            if prediction is None:
+                prediction = predict_one(loaded, features)
+                prediction_cache.set(cache_key, prediction)
             
             return Response({
                 'predicted_price': round(prediction, 2),
+                'model_version': loaded.version,
                 'status': 'success'
             })
             
+        except ModelNotAvailable as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
         except Exception as e:
             return Response({
                 'error': str(e)
-            }, status=status.HTTP_400_BAD_REQUEST) 
+            }, status=status.HTTP_400_BAD_REQUEST)
 
 
+class PredictionStatsView(APIView):
+    def get(self, request):
+        return Response({
+            'model_version': price_model_registry.version,
+            'cache': prediction_cache.stats()
+        })
 
 
+class BatchPricePredictionView(APIView):
+    parser_classes = (JSONParser, MultiPartParser, FormParser)
 
+    def post(self, request):
+        # Records come either as a JSON list or as an uploaded CSV file with
+        # size, bedrooms and location columns
+        try:
+            if 'file' in request.FILES:
+                records = read_csv_records(request.FILES['file'])
+            else:
+                records = request.data.get('records') if isinstance(request.data, dict) else request.data
+        except (UnicodeDecodeError, csv.Error) as e:
+            return Response({'error': f'Invalid CSV file: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not isinstance(records, list) or not records:
+            return Response({
+                'error': 'Provide a non-empty list of records or a CSV file'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if len(records) > MAX_BATCH_SIZE:
+            return Response({
+                'error': f'A batch can contain at most {MAX_BATCH_SIZE} records'
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def place_bid(request):
-    try:
-        property_id = request.data.get('property_id')
-        bid_amount = request.data.get('bid_amount')
-        
-        # Get the property
-        property_obj = Property.objects.get(id=property_id)
-        
-        # Validate minimum bid amount
-        min_bid = property_obj.actual_price*0.97
-        if float(bid_amount) < min_bid:
-            return Response(
-                {'error': f'Bid must be at least {min_bid}'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Check if this is the highest bid
-        highest_bid = property_obj.bids.first()
-        if highest_bid and float(bid_amount) <= highest_bid.bid_amount:
-            return Response(
-                {'error': 'Bid must be higher than the current highest bid'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Create the bid
-        bid = Bid.objects.create(
-            property=property_obj,
-            bidder=request.user,
-            bid_amount=bid_amount
-        )
-        
-        serializer = BidSerializer(bid)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
-        
-    except Property.DoesNotExist:
-        return Response(
-            {'error': 'Property not found'},
-            status=status.HTTP_404_NOT_FOUND
-        )
-    except Exception as e:
-        return Response(
-            {'error': str(e)},
-            status=status.HTTP_400_BAD_REQUEST
-        )
-    serializer_class = BidSerializer
+        try:
+            loaded = price_model_registry.get()
+        except ModelNotAvailable as e:
+            return Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
-    def get_queryset(self):
-        property_id = self.kwargs['property_id']
-        return Bid.objects.filter(property_id=property_id).order_by('-amount')
-
-    def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        highest_bid = queryset.first()
-        response_data = {
-            'highest_bid': BidSerializer(highest_bid).data if highest_bid else None,
-            'total_bids': queryset.count(),
-            'all_bids': BidSerializer(queryset, many=True).data
-        }
-        return Response(response_data)
+        matrix, indexes, errors = build_feature_matrix(records)
+        try:
+            predictions = predict_rows(loaded, matrix)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+        results = [
+            {'index': index, 'predicted_price': round(float(price), 2)}
+            for index, price in zip(indexes, predictions)
+        ]
+        return Response({
+            'results': results,
+            'errors': errors,
+            'model_version': loaded.version,
+            'status': 'success'
+        })
 
-    serializer_class = BidSerializer
-    permission_classes = [IsAuthenticated]
 
-    def create(self, request, *args, **kwargs):
-        property_id = request.data.get('property')
-        amount = float(request.data.get('amount'))
 
-        property_instance = get_object_or_404(Property, id=property_id)
-        highest_bid = Bid.objects.filter(property=property_instance).order_by('-amount').first()
 
-        # Validate bid amount
-        min_increment = float(property_instance.actual_price) * 1.5
-        if highest_bid and amount <= highest_bid.amount:
-            return Response({"error": "Bid must be higher than the current highest bid"}, status=status.HTTP_400_BAD_REQUEST)
-        if amount < min_increment:
-            return Response({"error": f"Minimum bid increment is Rs. {min_increment}"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Create bid
-        bid = Bid.objects.create(property=property_instance, bidder=request.user, amount=amount)
-        return Response(BidSerializer(bid).data, status=status.HTTP_201_CREATED)
 
-    def get(self, request, property_id):
-        try:
-            bids = Bid.objects.filter(property_id=property_id).order_by('-amount')
-            highest_bid = bids.first()
-            
-            response_data = {
-                'highest_bid': BidSerializer(highest_bid).data if highest_bid else None,
-                'total_bids': bids.count(),
-                'all_bids': BidSerializer(bids, many=True).data
-            }
-            
-            return Response(response_data)
-        except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST) 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def place_bid(request):
+    try:
+        bid = bidding.place_bid(
+            request.data.get('property_id'),
+            request.user,
+            request.data.get('bid_amount')
+        )
+        serializer = BidSerializer(bid)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+    except bidding.BidError as e:
+        return Response({'error': str(e)}, status=e.status_code)
 
 class PropertyBidsView(APIView):
     def get(self, request, property_id):
         try:
             property_obj = get_object_or_404(Property, id=property_id)
-            bids = Bid.objects.filter(property_id=property_id).order_by('-amount')
-            highest_bid = bids.first()
+            bids = Bid.objects.filter(property_id=property_id).select_related('property', 'bidder')
+            highest_bid = None
+            if property_obj.highest_bid_amount is not None:
+                highest_bid = bids.filter(amount=property_obj.highest_bid_amount).first()
+
+            # Polling clients pass since=<last seen bid id or timestamp>
+            # and only receive what changed
+            bids = filter_bids_since(bids, request.query_params.get('since'))
+            paginator = BidCursorPagination()
+            page = paginator.paginate_queryset(bids, request, view=self)
             
             # Check if bidding is closed due to time or acceptance
-            bidding_closed = (
-                property_obj.is_bidding_closed or 
-                bids.filter(status='accepted').exists()
-            )
+            time_expired = property_obj.is_bidding_closed
+            bidding_closed = time_expired or property_obj.accepted_bid_id is not None
             
             response_data = {
                 'highest_bid': BidSerializer(highest_bid).data if highest_bid else None,
-                'total_bids': bids.count(),
-                'all_bids': BidSerializer(bids, many=True).data,
+                'total_bids': property_obj.bid_count,
+                'all_bids': BidSerializer(page, many=True).data,
+                'next': paginator.get_next_link(),
+                'previous': paginator.get_previous_link(),
                 'bidding_closed': bidding_closed,
-                'closed_reason': 'time_expired' if property_obj.is_bidding_closed else 'bid_accepted' if bidding_closed else None
+                'closed_reason': 'time_expired' if time_expired else 'bid_accepted' if bidding_closed else None
             }
             
             return Response(response_data)
+        except FilterError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+def _sync_event_stream(channel):
+    subscription = get_broker().subscribe(channel)
+    try:
+        yield ': connected\n\n'
+        while True:
+            event = subscription.get(timeout=KEEPALIVE_INTERVAL)
+            yield format_sse(event) if event else ': keepalive\n\n'
+    finally:
+        subscription.close()
+
+
+async def _async_event_stream(channel):
+    # Subscribe inside the event loop so events arrive on an asyncio queue
+    subscription = get_broker().subscribe(channel)
+    try:
+        yield ': connected\n\n'
+        while True:
+            event = await subscription.aget(timeout=KEEPALIVE_INTERVAL)
+            yield format_sse(event) if event else ': keepalive\n\n'
+    finally:
+        subscription.close()
+
+
+def property_bid_stream(request, property_id):
+    """Server-Sent Events fallback for clients that can't open a websocket.
+
+    Under ASGI the stream is served from the event loop; under WSGI each
+    open stream holds a worker thread.
+    """
+    get_object_or_404(Property, id=property_id)
+    channel = property_channel(property_id)
+    if isinstance(request, ASGIRequest):
+        stream = _async_event_stream(channel)
+    else:
+        stream = _sync_event_stream(channel)
+
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 class PlaceBidView(APIView):
+    # The bidder is the token's user, resolved once by DRF and cached on
+    # the request, rather than looked up from a client-supplied email
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
     def post(self, request):
         try:
             property_id = request.data.get('property')
-            property_obj = get_object_or_404(Property, id=property_id)
-
-            # Check if bidding is closed due to time
-            if property_obj.is_bidding_closed:
-                return Response(
-                    {'error': 'Bidding time has expired for this property'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
             amount = request.data.get('amount')
-            email = request.data.get('email')
 
-            # Convert amount to Decimal
-            try:
-                if isinstance(amount, str):
-                    amount = Decimal(amount.replace(',', ''))
-                else:
-                    amount = Decimal(str(amount))
-            except (InvalidOperation, ValueError):
-                return Response(
-                    {'error': 'Invalid bid amount'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            # Get the property and user
-            property_obj = get_object_or_404(Property, id=property_id)
-            user = get_object_or_404(CustomUser, email=email)
-
-            # Create the bid with the user
-            bid = Bid.objects.create(
-                property=property_obj,
-                amount=amount,
-                bidder=user
-            )
+            # Validation and creation happen under a lock on the property row
+            bid = bidding.place_bid(property_id, request.user, amount)
 
             return Response({
                 'message': 'Bid placed successfully',
                 'bid': BidSerializer(bid).data
             }, status=status.HTTP_201_CREATED)
 
-        except Property.DoesNotExist:
-            return Response({'error': 'Property not found'}, status=status.HTTP_404_NOT_FOUND)
-        except CustomUser.DoesNotExist:
-            return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+        except bidding.BidError as e:
+            return Response({'error': str(e)}, status=e.status_code)
         except Exception as e:
             print("Error:", str(e))
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -468,12 +611,15 @@ class PlaceBidView(APIView):
 class AllBidsView(APIView):
     def get(self, request):
         try:
-            # Get all bids with related property and bidder info
-            bids = Bid.objects.select_related('property', 'bidder').all().order_by('-created_at')
+            # Get bids with related property and bidder info, one page at a time
+            bids = Bid.objects.select_related('property', 'bidder').all()
+            bids = filter_bids_since(bids, request.query_params.get('since'))
+            paginator = BidCursorPagination()
+            page = paginator.paginate_queryset(bids, request, view=self)
             
             # Serialize with additional property info
             bid_data = []
-            for bid in bids:
+            for bid in page:
                 bid_info = {
                     'id': bid.id,
                     'property': bid.property.id,
@@ -485,49 +631,27 @@ class AllBidsView(APIView):
                 }
                 bid_data.append(bid_info)
             
-            return Response(bid_data)
+            return paginator.get_paginated_response(bid_data)
             
+        except FilterError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 class BidActionView(APIView):
     def post(self, request, bid_id, action):
         try:
-            bid = get_object_or_404(Bid, id=bid_id)
-            
-            # Validate the action
-            if action not in ['accept', 'reject', 'pending']:
-                return Response(
-                    {'error': 'Invalid action'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            # If accepting a bid, reject all other bids for the same property
-            if action == 'accept':
-                bid.status = 'accepted'
-                # Reject all other bids for this property
-                Bid.objects.filter(property=bid.property).exclude(id=bid.id).update(
-                    status='rejected',
-                    notified=False  # Reset notification status for rejected bids
-                )
-            elif action == 'reject':
-                bid.status = 'rejected'
-            else:  # pending
-                bid.status = 'pending'
-            
-            # Reset notification status when status changes
-            bid.notified = False
-            bid.save()
+            bid = bidding.set_bid_status(bid_id, action)
             
             return Response({
                 'message': f'Bid {action}ed successfully',
                 'status': bid.status
             })
             
-        except Bid.DoesNotExist:
+        except bidding.BidError as e:
             return Response(
-                {'error': 'Bid not found'}, 
-                status=status.HTTP_404_NOT_FOUND
+                {'error': str(e)}, 
+                status=e.status_code
             )
         except Exception as e:
             return Response(
@@ -535,39 +659,151 @@ class BidActionView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+def _parse_bid_ids(values):
+    if not isinstance(values, list) or not values:
+        raise ValueError("'bid_ids' must be a non-empty list")
+    try:
+        return [int(value) for value in values]
+    except (TypeError, ValueError):
+        raise ValueError("'bid_ids' must contain bid ids")
+
+
+class BulkBidActionView(APIView):
+    MAX_ACTIONS = 1000
+
+    def post(self, request):
+        # Either {"actions": [{"bid_id": 1, "action": "accept"}, ...]}
+        # or {"bid_ids": [1, 2, 3], "action": "reject"}
+        try:
+            if 'actions' in request.data:
+                actions = [(int(item['bid_id']), item['action']) for item in request.data['actions']]
+            else:
+                action = request.data.get('action')
+                actions = [(bid_id, action) for bid_id in _parse_bid_ids(request.data.get('bid_ids'))]
+        except (KeyError, TypeError, ValueError) as e:
+            message = str(e) if isinstance(e, ValueError) else 'Each action needs a bid_id and an action'
+            return Response({'error': message}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not actions:
+            return Response({'error': 'No actions given'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(actions) > self.MAX_ACTIONS:
+            return Response(
+                {'error': f'At most {self.MAX_ACTIONS} actions per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        summary = bidding.set_bid_statuses(actions)
+        return Response(summary)
+
+
+class BulkMarkBidsNotifiedView(APIView):
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            bid_ids = _parse_bid_ids(request.data.get('bid_ids'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        updated = bidding.mark_bids_notified(bid_ids, request.user)
+        return Response({'message': 'Bids marked as notified', 'updated': updated})
+
+
 class BidViewSet(viewsets.ModelViewSet):
     queryset = Bid.objects.all()
     serializer_class = BidSerializer
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
 
     def create(self, request, *args, **kwargs):
-        data = request.data.copy()
-        
-        # Get the user from the email
-        user_email = data.get('email')
         try:
-            user = CustomUser.objects.get(email=user_email)
-            data['bidder'] = user.id
-        except CustomUser.DoesNotExist:
-            return Response({'error': 'User not found'}, status=status.HTTP_400_BAD_REQUEST)
-
-        serializer = self.get_serializer(data=data)
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            bid = bidding.place_bid(request.data.get('property'), request.user, request.data.get('amount'))
+        except bidding.BidError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+        return Response(self.get_serializer(bid).data, status=status.HTTP_201_CREATED)
 
     def get_queryset(self):
         return Bid.objects.all().select_related('property', 'bidder') 
 
 class UserBidsView(APIView):
-    def get(self, request, email):
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
         try:
-            bids = Bid.objects.filter(bidder__email=email).select_related('property', 'bidder')
+            # Filters on the indexed bidder_id instead of joining on email
+            bids = Bid.objects.filter(bidder_id=request.user.id).select_related('property', 'bidder')
             serializer = BidSerializer(bids, many=True)
             return Response(serializer.data)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+@method_decorator(csrf_exempt, name='dispatch')
+class NotificationInboxView(View):
+    """Unread bid status changes for the authenticated bidder.
+
+    Under ASGI, pass ``wait=<seconds>`` to long-poll: when nothing is
+    unread the request awaits the bidder's event channel (published by
+    users.bidding on commit) instead of polling the database, so waiting
+    clients hold no thread. Under WSGI a wait would pin a worker, so it is
+    ignored and clients poll.
+    """
+    MAX_WAIT = 30
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 100
+
+    @staticmethod
+    def _authenticate(request):
+        try:
+            result = CachedTokenAuthentication().authenticate(request)
+        except AuthenticationFailed as e:
+            return None, str(e.detail)
+        if result is None:
+            return None, 'Authentication credentials were not provided.'
+        return result[0], None
+
+    @staticmethod
+    def _unread(user, limit):
+        # Served by the partial index on unread, non-pending bids; pending
+        # bids are the user's own and carry no news
+        unread = Bid.objects.filter(bidder=user, notified=False).exclude(status='pending')
+        unread_count = unread.count()
+        bids = unread.select_related('property', 'bidder').order_by('-created_at')[:max(limit, 1)] if unread_count else []
+        return {
+            'unread_count': unread_count,
+            'results': BidSerializer(bids, many=True).data
+        }
+
+    async def get(self, request):
+        user, error = await sync_to_async(self._authenticate)(request)
+        if user is None:
+            response = JsonResponse({'detail': error}, status=status.HTTP_401_UNAUTHORIZED)
+            response['WWW-Authenticate'] = 'Token'
+            return response
+        try:
+            wait = min(float(request.GET.get('wait', 0)), self.MAX_WAIT)
+            limit = min(int(request.GET.get('limit', self.DEFAULT_LIMIT)), self.MAX_LIMIT)
+        except ValueError:
+            return JsonResponse({'error': "'wait' and 'limit' must be numbers"}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(request, ASGIRequest):
+            wait = 0
+
+        # Subscribe before counting so a change committed in between still
+        # wakes the wait
+        subscription = get_broker().subscribe(user_channel(user.id)) if wait > 0 else None
+        try:
+            data = await sync_to_async(self._unread)(user, limit)
+            if not data['unread_count'] and subscription is not None:
+                # With the in-process broker, changes made by other processes
+                # (close_auctions) show up when the wait expires
+                await subscription.aget(timeout=wait)
+                data = await sync_to_async(self._unread)(user, limit)
+        finally:
+            if subscription is not None:
+                subscription.close()
+        return JsonResponse(data)
+
+
 class MarkBidNotifiedView(APIView):
     def post(self, request, bid_id):
         try: